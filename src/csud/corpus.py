@@ -0,0 +1,176 @@
+'''
+Textes de référence préparés (voir ``csud.crypto.prepare``) et
+statistiques précalculées par langue.
+
+Les textes sont stockés compressés dans le dossier ``data`` du paquet et ne
+sont décompressés qu'au premier accès :
+
+>>> from csud.corpus import corpus_names, load_corpus
+>>> corpus_names('german')
+['faust_1', 'also_sprach_zarathustra']
+>>> load_corpus('faust_1')[:14]
+'FAUSTDERTRAGOD'
+
+On peut aussi les importer directement comme de simples variables :
+
+    from csud.corpus import miserables_tome_1
+
+ou tous à la fois avec ``from csud.corpus import *``.
+
+Les comptes de lettres, de bigrammes et de quadrigrammes de chaque langue
+sont précalculés : les obtenir ne nécessite pas de charger les textes.
+
+Les textes de chaque langue ont été préparés avec la table de repli
+``FOLDINGS[langue]`` : pour comparer un texte aux statistiques de référence,
+il faut le préparer avec la même table.
+
+>>> from csud.crypto import prepare
+>>> prepare("Die Straße zur Tragödie", language=FOLDINGS['german'])
+'DIESTRAEZURTRAGODIE'
+
+Les fichiers de données sont produits par ``utils/build_corpus_data.py``.
+'''
+import struct
+import sys
+import zlib
+from array import array
+from functools import lru_cache
+from importlib.resources import files
+from itertools import accumulate
+
+# Textes disponibles et leur langue
+CORPORA = {
+    'miserables_tome_1': 'french',
+    'miserables_tome_3': 'french',
+    'miserables_tome_5': 'french',
+    'trois_mousquetaires': 'french',
+    'faust_1': 'german',
+    'also_sprach_zarathustra': 'german',
+}
+
+# Table de repli de ``csud.crypto.prepare`` utilisée pour préparer les
+# textes de chaque langue
+FOLDINGS = {
+    'french': 'french',
+    'german': 'german_legacy',
+}
+
+# Longueurs des n-grammes dont les comptes sont précalculés
+NGRAM_SIZES = (1, 2, 4)
+
+# API publique : ``from csud.corpus import *`` importe aussi tous les textes
+# (chargés par ``__getattr__``), comme ``from prepared_fr_texts import *``
+__all__ = ['CORPORA', 'FOLDINGS', 'NGRAM_SIZES', 'corpus_names', 'languages', 'load_corpus', 'ngram_reference', *CORPORA]
+
+_MAGIC = b'CSUD'
+_VERSION = 1
+
+
+def _data_path(filename: str):
+    return files('csud') / 'data' / filename
+
+
+def corpus_names(language: str | None = None) -> list[str]:
+    '''
+    Retourne les noms des textes disponibles, éventuellement seulement ceux
+    de la langue ``language``.
+    '''
+    return [name for name, lang in CORPORA.items() if language is None or lang == language]
+
+
+def languages() -> list[str]:
+    ''' Retourne les langues pour lesquelles des statistiques sont disponibles '''
+    return list(dict.fromkeys(CORPORA.values()))
+
+
+@lru_cache(maxsize=None)
+def load_corpus(name: str) -> str:
+    '''
+    Retourne le texte préparé ``name`` (voir ``corpus_names``). Le texte
+    n'est décompressé qu'une fois, au premier appel.
+    '''
+    if name not in CORPORA:
+        raise ValueError(f"Unknown corpus '{name}'. Known corpora: {list(CORPORA)}")
+    return zlib.decompress(_data_path(f'{name}.txt.z').read_bytes()).decode('ascii')
+
+
+def _uint32_array(data: bytes) -> array:
+    ''' Tableau d'entiers non signés de 32 bits stockés en petit-boutiste '''
+    values = array('I')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def encode_statistics(alphabet: str, counts: dict[int, dict[int, int]]) -> bytes:
+    '''
+    Encode les comptes de n-grammes d'une langue ({n: {code: nombre}})
+    dans le format binaire compressé lu par ``ngram_reference``.
+
+    Les codes, triés, sont stockés sous forme d'écarts successifs, ce qui
+    se compresse beaucoup mieux.
+    '''
+    parts = [struct.pack('<4sBB', _MAGIC, _VERSION, len(alphabet)), alphabet.encode('ascii'),
+             struct.pack('<B', len(counts))]
+    for n, ngrams in sorted(counts.items()):
+        codes = sorted(ngrams)
+        gaps = array('I', [code - previous for previous, code in zip([0] + codes, codes)])
+        values = array('I', [ngrams[code] for code in codes])
+        if sys.byteorder == 'big':
+            gaps.byteswap()
+            values.byteswap()
+        parts += [struct.pack('<BI', n, len(codes)), gaps.tobytes(), values.tobytes()]
+    return zlib.compress(b''.join(parts), 9)
+
+
+@lru_cache(maxsize=None)
+def _statistics(language: str) -> tuple[str, dict[int, dict[int, int]]]:
+    ''' Alphabet et comptes de n-grammes précalculés de la langue ``language`` '''
+    if language not in languages():
+        raise ValueError(f"Unknown language '{language}'. Known languages: {languages()}")
+    data = zlib.decompress(_data_path(f'{language}.ngrams.z').read_bytes())
+    magic, version, size = struct.unpack_from('<4sBB', data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"invalid statistics file for language '{language}'")
+    offset = struct.calcsize('<4sBB')
+    alphabet = data[offset:offset + size].decode('ascii')
+    offset += size
+    (sections,) = struct.unpack_from('<B', data, offset)
+    offset += 1
+    counts = {}
+    for _ in range(sections):
+        n, length = struct.unpack_from('<BI', data, offset)
+        offset += struct.calcsize('<BI')
+        gaps = _uint32_array(data[offset:offset + 4 * length])
+        values = _uint32_array(data[offset + 4 * length:offset + 8 * length])
+        offset += 8 * length
+        counts[n] = dict(zip(accumulate(gaps), values))
+    return alphabet, counts
+
+
+def ngram_reference(language: str, n: int) -> tuple[str, dict[int, int]]:
+    '''
+    Retourne l'alphabet de la langue et les comptes précalculés de ses
+    n-grammes, sous la forme {code du n-gramme: nombre d'apparitions} (voir
+    ``csud.crypto.ngram_code``). ``n`` vaut 1, 2 ou 4.
+
+    >>> alphabet, counts = ngram_reference('french', 1)
+    >>> max(counts, key=counts.get) == alphabet.index('E')
+    True
+    '''
+    alphabet, counts = _statistics(language)
+    if n not in counts:
+        raise ValueError(f"no precomputed statistics for n={n}. Available: {sorted(counts)}")
+    return alphabet, counts[n]
+
+
+def __getattr__(name: str) -> str:
+    # Permet « from csud.corpus import faust_1 » sans charger les autres textes
+    if name in CORPORA:
+        return load_corpus(name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *CORPORA])
@@ -1,5 +1,36 @@
-import matplotlib.pyplot as plt
-from random import shuffle
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from functools import lru_cache, wraps
+from itertools import product, repeat
+from operator import lshift, mul, or_
+from math import gcd, log10
+from random import Random, shuffle
+import sys
+from time import perf_counter
+import unicodedata
+
+# API publique : ``from csud.crypto import *`` n'importe que ces noms, et
+# pas les outils utilisés par le module (Counter, lru_cache, sys...)
+__all__ = [
+    # Chiffrements
+    'permutate_abc', 'rotate', 'CompiledKey', 'compile_key', 'substitution', 'caesar', 'vigenere',
+    'affine', 'EncodedText', 'encode_text',
+    # N-grammes et fréquences
+    'ngram_code', 'generate_ngrams', 'ngram_counts', 'generate_digrams', 'digram_frequencies',
+    'extract_subtexts', 'SubstitutionSession', 'apply_substitutions', 'FrequencyProfile',
+    'frequency_profile', 'letter_frequencies', 'render_frequencies', 'plot_frequencies',
+    'french_frequencies', 'get_frequencies', 'reference_ngram_counts',
+    # Préparation et lecture des textes
+    'register_folding', 'prepare', 'load_text', 'iter_text', 'iter_prepare', 'NgramCounter',
+    'stream_letter_frequencies', 'stream_digram_frequencies', 'stream_ngram_counts', 'stream_profile',
+    # Statistiques et attaques
+    'friedman_characteristic', 'index_of_coincidence', 'chi_squared', 'rolling_ic', 'rolling_friedman',
+    'deviating_segments', 'KasiskiResult', 'kasiski', 'rank_caesar', 'rank_affine', 'break_vigenere',
+    'quadgram_table', 'break_substitution', 'ANALYSIS_METRICS', 'iter_analyze_many', 'analyze_many',
+    # Profilage
+    'enable_profiling', 'disable_profiling', 'reset_profiling', 'profiling', 'profiling_report',
+]
 
 def permutate_abc(alphabet='ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
     # Convertir l'alphabet en une liste de caractères
@@ -20,13 +51,198 @@ def rotate(shift):
     'ZABCDEFGHIJKLMNOPQRSTUVWXY'
     '''
     alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-    shifted_alphabet = ''
+    shift %= len(alphabet)
+    return alphabet[shift:] + alphabet[:shift]
+
+
+# Caractères dont la majuscule est une autre lettre que celle dont ils sont la
+# minuscule (par exemple 'ı'.upper() == 'I' alors que 'I'.lower() == 'i') :
+# ``alphabet.lower()`` ne les retrouve pas, ils sont donc listés ici.
+_UPPERCASE_ALIASES = 'µıſǅǈǋǲ\u0345ςϐϑϕϖϰϱϵᲀᲁᲂᲃᲄᲅᲆᲇᲈẛι'
+
+
+@lru_cache(maxsize=64)
+def _letter_indices(alphabet: str) -> dict[str, int]:
+    '''
+    Associe à chaque caractère accepté par les chiffrements (tout caractère
+    dont la majuscule est une lettre de ``alphabet``) l'indice de cette lettre.
+
+    >>> indices = _letter_indices('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+    >>> indices['a'], indices['ı'], indices['ſ']
+    (0, 8, 18)
+    '''
+    indices = {}
+    for char in alphabet + alphabet.lower() + _UPPERCASE_ALIASES:
+        upper = char.upper()
+        if len(upper) == 1 and upper in alphabet:
+            indices.setdefault(char, alphabet.index(upper))
+    return indices
+
+
+@lru_cache(maxsize=64)
+def _deletion_table(alphabet: str) -> dict[int, None]:
+    ''' Table pour ``str.translate`` qui supprime toutes les lettres de l'alphabet '''
+    return dict.fromkeys(map(ord, _letter_indices(alphabet)))
+
+
+@lru_cache(maxsize=256)
+def _shift_table(alphabet: str, shift: int) -> dict[int, str]:
+    ''' Table pour ``str.translate`` qui décale chaque lettre de ``shift`` positions '''
+    return {ord(char): alphabet[(index + shift) % len(alphabet)]
+            for char, index in _letter_indices(alphabet).items()}
+
+
+@lru_cache(maxsize=256)
+def _substitution_table(key: str, alphabet: str, decrypt: bool) -> dict[int, str]:
+    ''' Table pour ``str.translate`` qui applique la clé de substitution ``key`` '''
+    table = {}
+    for char, index in _letter_indices(alphabet).items():
+        if decrypt:
+            letter = alphabet[index]
+            if letter not in key:
+                raise ValueError(f"key does not contain letter '{letter}'")
+            table[ord(char)] = alphabet[key.index(letter)]
+        else:
+            if index >= len(key):
+                raise ValueError(f"key is shorter than alphabet ({len(key)} < {len(alphabet)})")
+            table[ord(char)] = key[index]
+    return table
+
+
+class CompiledKey:
+    '''
+    Clé précompilée pour les chiffrements par substitution, de César,
+    affine et de Vigenère.
+
+    Les tables de traduction sont calculées une seule fois puis
+    réutilisées pour chaque message, ce qui évite de parcourir l'alphabet
+    pour chaque caractère. On obtient un tel objet avec ``compile_key``.
 
-    for i in range(len(alphabet)):
-        shifted_index = (i + shift) % len(alphabet)
-        shifted_alphabet += alphabet[shifted_index]
+    >>> k = compile_key('LEMON', cipher='vigenere')
+    >>> k.encrypt('ATTACKATDAWN')
+    'LXFOPVEFRNHR'
+    >>> k.decrypt('LXFOPVEFRNHR')
+    'ATTACKATDAWN'
+    '''
+
+    CIPHERS = ('substitution', 'caesar', 'affine', 'vigenere')
+
+    def __init__(self, key, cipher: str = 'substitution', alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
+        if cipher not in self.CIPHERS:
+            raise ValueError(f"Unknown cipher '{cipher}'. Known ciphers: {list(self.CIPHERS)}")
+        self.key = key
+        self.cipher = cipher
+        self.alphabet = alphabet
+        self._translations = {}
+        if cipher == 'vigenere':
+            if not key:
+                raise ValueError("key must not be empty")
+            self.shifts = [alphabet.index(char.upper()) for char in key]
+        elif cipher == 'affine':
+            a, b = key
+            if gcd(a, len(alphabet)) != 1:
+                raise ValueError(f"a={a} must be coprime with the alphabet length {len(alphabet)}")
+            self.permutation = ''.join(alphabet[(a * i + b) % len(alphabet)] for i in range(len(alphabet)))
+
+    def _tables(self, decrypt: bool) -> list[dict[int, str]]:
+        ''' Tables de traduction à appliquer périodiquement au texte '''
+        if self.cipher == 'substitution':
+            return [_substitution_table(self.key, self.alphabet, decrypt)]
+        if self.cipher == 'caesar':
+            # Comme ``caesar``, le déchiffrement chiffre avec le décalage opposé
+            shift = -self.key if decrypt else self.key
+            return [_substitution_table(rotate(shift), self.alphabet, False)]
+        if self.cipher == 'affine':
+            return [_substitution_table(self.permutation, self.alphabet, decrypt)]
+        sign = -1 if decrypt else 1
+        return [_shift_table(self.alphabet, sign * shift) for shift in self.shifts]
+
+    def _check(self, text: str) -> None:
+        ''' Vérifie que ``text`` ne contient que des lettres de l'alphabet (Vigenère) '''
+        if text.translate(_deletion_table(self.alphabet)):
+            indices = _letter_indices(self.alphabet)
+            for i, char in enumerate(text):
+                if char not in indices:
+                    raise ValueError(f"text contains char '{char}' at position {i} not in alphabet")
+
+    def _byte_tables(self, decrypt: bool) -> list[bytes] | None:
+        '''
+        Tables pour ``bytes.translate`` qui donnent, pour chaque indice de
+        lettre, la lettre (ASCII) du résultat ; None si l'alphabet ou la clé
+        ne sont pas en ASCII.
+        '''
+        if decrypt not in self._translations:
+            alphabet = self.alphabet
+            tables = [''.join(table[ord(letter)] for letter in alphabet) for table in self._tables(decrypt)]
+            if alphabet.isascii() and all(table.isascii() for table in tables):
+                tables = [table.encode('ascii').ljust(256, b'\0') for table in tables]
+            else:
+                tables = None
+            self._translations[decrypt] = tables
+        return self._translations[decrypt]
+
+    def _apply_encoded(self, text: 'EncodedText', decrypt: bool) -> str:
+        ''' Comme ``_apply``, mais directement sur les indices d'un texte encodé '''
+        codes = text._bytes()
+        tables = self._byte_tables(decrypt)
+        if _NOT_A_LETTER in codes or tables is None:
+            # Minuscules et caractères hors de l'alphabet : le texte d'origine
+            # est chiffré (et vérifié pour Vigenère) comme une chaîne
+            return self._apply(text.text, decrypt)
+        period = len(tables)
+        if period == 1:
+            return codes.translate(tables[0]).decode('ascii')
+        result = bytearray(len(codes))
+        for offset, table in enumerate(tables[:len(codes)]):
+            result[offset::period] = codes[offset::period].translate(table)
+        return result.decode('ascii')
+
+    def _apply(self, text: str, decrypt: bool) -> str:
+        if isinstance(text, EncodedText):
+            return self._apply_encoded(_encoded(text, self.alphabet), decrypt)
+        tables = self._tables(decrypt)
+        if self.cipher == 'vigenere':
+            self._check(text)
+        period = len(tables)
+        if period == 1:
+            return text.translate(tables[0])
+        # Chaque colonne du texte est traduite avec la table de sa lettre de clé
+        result = [''] * len(text)
+        for offset, table in enumerate(tables[:len(text)]):
+            result[offset::period] = text[offset::period].translate(table)
+        return ''.join(result)
+
+    def encrypt(self, text: str) -> str:
+        ''' Chiffre ``text`` avec la clé compilée '''
+        return self._apply(text, decrypt=False)
+
+    def decrypt(self, text: str) -> str:
+        ''' Déchiffre ``text`` avec la clé compilée '''
+        return self._apply(text, decrypt=True)
+
+    def __repr__(self):
+        return f"CompiledKey({self.key!r}, cipher={self.cipher!r}, alphabet={self.alphabet!r})"
+
+
+@lru_cache(maxsize=128)
+def compile_key(key, cipher: str = 'substitution', alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> CompiledKey:
+    '''
+    Retourne la clé ``key`` précompilée pour le chiffrement ``cipher``
+    ('substitution', 'caesar', 'affine' ou 'vigenere'). Pour César, la clé
+    est le décalage ; pour le chiffre affine, le couple ``(a, b)``.
 
-    return shifted_alphabet
+    Les clés compilées récemment sont conservées dans un cache de taille
+    limitée : compiler plusieurs fois la même clé ne coûte rien.
+
+    >>> k = compile_key('QOLWNXTMGDKBPRSEUVFZHJIYCA')
+    >>> k.encrypt('Salut !')
+    'FQBHZ !'
+    >>> compile_key(3, cipher='caesar').decrypt('KHOOR')
+    'HELLO'
+    >>> compile_key(3, cipher='caesar') is compile_key(3, cipher='caesar')
+    True
+    '''
+    return CompiledKey(key, cipher, alphabet)
 
 
 def substitution(text: str, key: str, decrypt: bool = False, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> str:
@@ -38,27 +254,11 @@ def substitution(text: str, key: str, decrypt: bool = False, alphabet: str = 'AB
     'FQBHZ'
     >>> substitution('FQBHZ', key, decrypt=True)
     'SALUT'
+    >>> substitution('ı', key)
+    'G'
     '''
-    # Initialisation du texte chiffré comme une chaîne vide
-    result = ''
-
-    # Pour chaque caractère dans le texte à traiter
-    for char in text:
-        if char.upper() in alphabet:
-            if decrypt:
-                index = key.index(char.upper())
-                newchar = alphabet[index]
-            else:
-                index = alphabet.index(char.upper())
-                newchar = key[index]
-            # Ajout de la lettre chiffrée au texte chiffré en construction
-            result += newchar
-        else:
-            # Si le caractère n'est pas dans l'alphabet, on l'ajoute tel quel au résultat
-            result += char
-
-    # Après avoir traité tous les caractères, on retourne le texte chiffré
-    return result
+    compiled = compile_key(key, 'substitution', alphabet)
+    return compiled.decrypt(text) if decrypt else compiled.encrypt(text)
 
 
 def caesar(text: str, shift: int, decrypt: bool = False, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> str:
@@ -70,10 +270,8 @@ def caesar(text: str, shift: int, decrypt: bool = False, alphabet: str = 'ABCDEF
     >>> caesar("KHOOR", 3, decrypt=True)
     'HELLO'
     '''
-    if decrypt:
-        shift = -shift
-    shifted_alphabet = rotate(shift)
-    return substitution(text, shifted_alphabet, alphabet=alphabet)
+    compiled = compile_key(shift, 'caesar', alphabet)
+    return compiled.decrypt(text) if decrypt else compiled.encrypt(text)
 
 
 def vigenere(text, key, decrypt=False, alphabet='ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
@@ -90,24 +288,319 @@ def vigenere(text, key, decrypt=False, alphabet='ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
     ValueError: text contains char ' ' at position 5 not in alphabet
     >>> vigenere("LXFOPVEFRNHR", "LEMON", decrypt=True)
     'ATTACKATDAWN'
+    >>> vigenere('ſ', 'KEY')
+    'C'
     '''
-    ciphertext = []
-    key_length = len(key)
-    for i, char in enumerate(text):
-        if char.upper() not in alphabet:
-            raise ValueError(f"text contains char '{char}' at position {i} not in alphabet")
-            
-        key_index = i % key_length
-        abc_index = alphabet.index(char.upper())
-        key_char = key[key_index].upper()
-        key_shift = alphabet.index(key_char)
-        if decrypt:
-            key_shift = -key_shift
-        shift = (abc_index + key_shift) % len(alphabet)
-        encrypted_char = alphabet[shift]
-        ciphertext.append(encrypted_char)
+    compiled = compile_key(key, 'vigenere', alphabet)
+    return compiled.decrypt(text) if decrypt else compiled.encrypt(text)
+
+
+def affine(text: str, a: int, b: int, decrypt: bool = False, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> str:
+    '''
+    Chiffre le texte avec le chiffre affine : la lettre d'indice x devient
+    la lettre d'indice (a * x + b) modulo la longueur de l'alphabet. Le
+    nombre ``a`` doit être premier avec la longueur de l'alphabet.
+
+    >>> affine("AFFINE", 5, 8)
+    'IHHWVC'
+    >>> affine("IHHWVC", 5, 8, decrypt=True)
+    'AFFINE'
+    >>> affine("AFFINE", 2, 8)
+    Traceback (most recent call last):
+      ...
+    ValueError: a=2 must be coprime with the alphabet length 26
+    '''
+    compiled = compile_key((a, b), 'affine', alphabet)
+    return compiled.decrypt(text) if decrypt else compiled.encrypt(text)
+
+
+# Valeur utilisée dans les textes encodés pour les caractères hors alphabet
+_NOT_A_LETTER = 255
+
+
+@lru_cache(maxsize=64)
+def _byte_table(alphabet: str) -> bytes:
+    ''' Table pour ``bytes.translate`` qui remplace chaque lettre ASCII par son indice '''
+    table = bytearray([_NOT_A_LETTER]) * 256
+    for index in reversed(range(len(alphabet))):
+        table[ord(alphabet[index])] = index
+    return bytes(table)
+
+
+def _encode_indices(text: str, alphabet: str) -> bytes:
+    '''
+    Encode ``text`` en une suite d'octets contenant l'indice de chaque
+    caractère dans ``alphabet`` (``_NOT_A_LETTER`` s'il n'y est pas).
+    '''
+    if len(alphabet) >= _NOT_A_LETTER:
+        raise ValueError(f"alphabet is too long ({len(alphabet)} >= {_NOT_A_LETTER} letters)")
+    if alphabet.isascii() and '?' not in alphabet:
+        # Les caractères non ASCII deviennent '?' : un octet par caractère
+        return text.encode('ascii', 'replace').translate(_byte_table(alphabet))
+    indices = {}
+    for index, char in enumerate(alphabet):
+        indices.setdefault(char, index)
+    return bytes([indices.get(char, _NOT_A_LETTER) for char in text])
+
+
+def _decode_indices(codes: bytes, alphabet: str) -> str:
+    ''' Inverse de ``_encode_indices`` pour une suite d'indices ne contenant que des lettres '''
+    if alphabet.isascii():
+        table = bytes(ord(alphabet[i]) if i < len(alphabet) else 0 for i in range(256))
+        return codes.translate(table).decode('ascii')
+    return ''.join([alphabet[i] for i in codes])
+
+
+# Table pour ``bytes.translate`` qui donne le masque des lettres (1) et des autres caractères (0)
+_MASK_TABLE = bytes([1] * _NOT_A_LETTER + [0])
+
+
+class EncodedText:
+    '''
+    Texte encodé une fois pour toutes en indices de lettres : chaque
+    caractère est remplacé par un octet, l'indice de la lettre dans
+    l'alphabet, ou 255 pour les autres caractères. Comme pour les fonctions
+    d'analyse, seuls les caractères de l'alphabet comptent comme des
+    lettres (les minuscules n'en font pas partie) : une fonction donne le
+    même résultat pour un texte et pour le même texte encodé. On obtient un
+    tel objet avec ``encode_text``.
+
+    ``substitution``, ``caesar``, ``affine``, ``vigenere``,
+    ``extract_subtexts``, ``letter_frequencies``, ``digram_frequencies``,
+    ``ngram_counts``, ``index_of_coincidence`` et
+    ``friedman_characteristic`` acceptent directement un texte encodé, sans
+    le décoder. Une tranche (``encoded[1::3]``) est une vue sur les mêmes
+    octets, sans copie.
+
+    Attributs :
+
+    - `codes` : les indices, en ``memoryview`` d'octets en lecture seule
+      (utilisable sans copie avec NumPy : ``numpy.asarray(encoded.codes)``)
+    - `mask` : 1 pour chaque lettre de l'alphabet, 0 pour les autres caractères
+    - `text` : le texte d'origine
+    - `alphabet` : l'alphabet utilisé
+
+    >>> encoded = encode_text("LE CHAT")
+    >>> list(encoded.codes)
+    [11, 4, 255, 2, 7, 0, 19]
+    >>> list(encoded.mask)
+    [1, 1, 0, 1, 1, 1, 1]
+    >>> encoded[::2].text
+    'L HT'
+    >>> index_of_coincidence(encode_text("hello")) == index_of_coincidence("hello")
+    True
+    '''
+
+    def __init__(self, text: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
+        self._codes = _encode_indices(text, alphabet)
+        self._source = text
+        self._slice = None
+        self.alphabet = alphabet
+
+    @classmethod
+    def _view(cls, codes, source: str, selection: slice | None, alphabet: str) -> 'EncodedText':
+        ''' Texte encodé partageant les octets ``codes`` (sans encoder à nouveau) '''
+        view = cls.__new__(cls)
+        view._codes = codes
+        view._source = source
+        view._slice = selection
+        view.alphabet = alphabet
+        return view
+
+    @property
+    def codes(self) -> memoryview:
+        ''' Indices des caractères (255 hors de l'alphabet), sans copie '''
+        return memoryview(self._codes)
+
+    @property
+    def mask(self) -> bytes:
+        ''' 1 pour chaque lettre de l'alphabet, 0 pour les autres caractères '''
+        return bytes(self._codes).translate(_MASK_TABLE)
+
+    @property
+    def text(self) -> str:
+        ''' Le texte d'origine (ou la partie correspondant à cette vue) '''
+        if self._slice is None:
+            return self._source
+        return self._source[self._slice]
+
+    def _bytes(self) -> bytes:
+        ''' Les indices en ``bytes`` (copiés seulement pour une vue) '''
+        return self._codes if isinstance(self._codes, bytes) else bytes(self._codes)
+
+    def letter_counts(self) -> list[int]:
+        ''' Nombre d'apparitions de chaque lettre de l'alphabet '''
+        if isinstance(self._codes, bytes):
+            return [self._codes.count(index) for index in range(len(self.alphabet))]
+        counter = Counter(self._codes)
+        return [counter[index] for index in range(len(self.alphabet))]
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self._codes[index]
+        codes = memoryview(self._codes)[index]
+        if self._slice is None:
+            selection = index
+        else:
+            # Tranche d'une tranche : indices dans le texte d'origine
+            start, stop, step = self._slice.indices(len(self._source))
+            positions = range(start, stop, step)[index]
+            if not positions:
+                selection = slice(0, 0)
+            else:
+                selection = slice(positions.start, positions.stop if positions.stop >= 0 else None, positions.step)
+        return EncodedText._view(codes, self._source, selection, self.alphabet)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return memoryview(self._codes)
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"EncodedText({self.text!r}, alphabet={self.alphabet!r})"
+
+
+@lru_cache(maxsize=16)
+def encode_text(text: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> EncodedText:
+    '''
+    Encode le texte en indices de lettres (voir ``EncodedText``). Les
+    derniers textes encodés sont gardés en cache : un même texte n'est
+    encodé qu'une seule fois.
+
+    >>> encoded = encode_text("ATTACK AT DAWN")
+    >>> vigenere(encode_text("ATTACKATDAWN"), "LEMON")
+    'LXFOPVEFRNHR'
+    >>> encode_text("ATTACK AT DAWN") is encoded
+    True
+    '''
+    return EncodedText(text, alphabet)
+
+
+def _encoded(text, alphabet: str) -> EncodedText:
+    ''' Le texte encodé avec ``alphabet`` (sans l'encoder à nouveau si c'est déjà fait) '''
+    if isinstance(text, EncodedText):
+        if text.alphabet == alphabet:
+            return text
+        text = text.text
+    return encode_text(text, alphabet)
+
+
+def _text_codes(text, alphabet: str):
+    ''' Indices des caractères de ``text`` (``str`` ou ``EncodedText``), comme ``_encode_indices`` '''
+    if isinstance(text, EncodedText):
+        return _encoded(text, alphabet)._codes
+    return _encode_indices(text, alphabet)
+
+
+def ngram_code(ngram: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> int:
+    '''
+    Retourne le code entier d'un n-gramme : le n-gramme est lu comme un
+    nombre en base ``len(alphabet)``. C'est aussi sa position dans la liste
+    ``generate_ngrams(alphabet, n)``.
+
+    >>> ngram_code('AB', 'ABC')
+    1
+    >>> ngram_code('CA', 'ABC')
+    6
+    >>> generate_ngrams('ABC', 2)[6]
+    'CA'
+    '''
+    code = 0
+    for char in ngram:
+        code = code * len(alphabet) + alphabet.index(char)
+    return code
+
+
+def generate_ngrams(alphabet: str, n: int) -> list[str]:
+    '''
+    Génère la liste de tous les n-grammes possibles à partir d'un
+    alphabet donné, dans l'ordre de leur code (voir ``ngram_code``).
+
+    >>> generate_ngrams("AB", 3)
+    ['AAA', 'AAB', 'ABA', 'ABB', 'BAA', 'BAB', 'BBA', 'BBB']
+    '''
+    return [''.join(letters) for letters in product(alphabet, repeat=n)]
+
+
+def _ngram_decoder(alphabet: str, n: int):
+    ''' Retourne une fonction qui convertit un code en n-gramme '''
+    size = len(alphabet)
+
+    def ngram_of(code: int) -> str:
+        letters = []
+        for _ in range(n):
+            code, digit = divmod(code, size)
+            letters.append(alphabet[digit])
+        return ''.join(reversed(letters))
+
+    return ngram_of
+
+
+def _ngram_code_counts(codes: bytes, n: int, size: int) -> dict[int, int]:
+    '''
+    Compte les n-grammes d'un texte encodé (voir ``_encode_indices``) et
+    retourne un dictionnaire {code du n-gramme: nombre d'apparitions}.
+    '''
+    # Chaque n-gramme est d'abord empaqueté en base 256 (un octet par
+    # lettre), ce qui permet de tout compter avec ``Counter`` sans boucle
+    # Python sur les caractères.
+    packed = iter(codes)
+    for offset in range(1, n):
+        packed = map(or_, map(lshift, packed, repeat(8)), codes[offset:])
+    packed_counts = Counter(packed)
+
+    # Conversion des codes en base 256 vers les codes en base len(alphabet)
+    counts = {}
+    for value, count in packed_counts.items():
+        code = 0
+        factor = 1
+        for _ in range(n):
+            digit = value & 0xFF
+            if digit >= size:
+                break
+            code += digit * factor
+            factor *= size
+            value >>= 8
+        else:
+            counts[code] = count
+    return counts
 
-    return ''.join(ciphertext)
+
+def ngram_counts(text: str, n: int = 2, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', dense: bool = False) -> dict[str, int] | list[int]:
+    '''
+    Compte les n-grammes (suites de ``n`` lettres consécutives de
+    l'alphabet) du texte en un seul passage.
+
+    Par défaut, retourne un dictionnaire ne contenant que les n-grammes
+    présents, dans l'ordre de leur code. Avec ``dense=True``, retourne la
+    liste des ``len(alphabet) ** n`` compteurs indexée par le code du
+    n-gramme (voir ``ngram_code``).
+
+    Les n-grammes contenant un caractère hors de l'alphabet sont ignorés.
+
+    >>> ngram_counts("ABABBA", 2, "ABC")
+    {'AB': 2, 'BA': 2, 'BB': 1}
+    >>> ngram_counts("ABABBA", 2, "ABC", dense=True)
+    [0, 2, 0, 2, 1, 0, 0, 0, 0]
+    >>> ngram_counts("LE LEVER", 3)
+    {'EVE': 1, 'LEV': 1, 'VER': 1}
+    '''
+    if n < 1:
+        raise ValueError(f"n must be at least 1, not {n}")
+    size = len(alphabet)
+    counts = _ngram_code_counts(_text_codes(text, alphabet), n, size)
+
+    if dense:
+        result = [0] * size ** n
+        for code, count in counts.items():
+            result[code] = count
+        return result
+    ngram_of = _ngram_decoder(alphabet, n)
+    return {ngram_of(code): counts[code] for code in sorted(counts)}
 
 
 def generate_digrams(alphabet: str) -> list[str]:
@@ -118,12 +611,7 @@ def generate_digrams(alphabet: str) -> list[str]:
     >>> generate_digrams("ABC")
     ['AA', 'AB', 'AC', 'BA', 'BB', 'BC', 'CA', 'CB', 'CC']
     '''
-
-    digrams = []
-    for a in alphabet:
-        for b in alphabet:
-            digrams.append(a + b)
-    return digrams
+    return generate_ngrams(alphabet, 2)
 
 
 def digram_frequencies(message: str, alphabet: str) -> list[tuple[str, float]]:
@@ -133,31 +621,15 @@ def digram_frequencies(message: str, alphabet: str) -> list[tuple[str, float]]:
 
     >>> digram_frequencies("ABABBA", "ABC")
     [('AA', 0.0), ('AB', 40.0), ('AC', 0.0), ('BA', 40.0), ('BB', 20.0), ('BC', 0.0), ('CA', 0.0), ('CB', 0.0), ('CC', 0.0)]
+    >>> digram_frequencies(encode_text("ABABBA", "ABC"), "ABC") == digram_frequencies("ABABBA", "ABC")
+    True
     '''
-
-    # Déterminer les bigrammes possibles sur la base de l'alphabet
-    digrams = []
-    for a in alphabet:
-        for b in alphabet:
-            digrams.append(a + b)
-
-    # compter le nombre d'apparitions de chaque digramme dans le texte
-    counters = [0] * len(digrams)
-    # Comptage des bigrammes
-    for i in range(len(message) - 1):
-        letter1 = message[i]
-        letter2 = message[i + 1]
-        pair = letter1 + letter2
-        if pair in digrams:
-            index = digrams.index(pair)
-            counters[index] += 1
+    counters = ngram_counts(message, 2, alphabet, dense=True)
 
     # Calcul des fréquences d'apparition en pourcentage
-    frequencies = []
     total_digrams = len(message) - 1
-    for i in range(len(digrams)):
-        count = counters[i]
-        digram = digrams[i]
+    frequencies = []
+    for digram, count in zip(generate_digrams(alphabet), counters):
         frequency = round(count / total_digrams * 100, 2) if total_digrams > 0 else 0.0
         frequencies.append((digram, frequency))
 
@@ -168,19 +640,143 @@ def extract_subtexts(ciphertext, key_length):
     '''
     Extrait les sous-textes d'un texte chiffré avec le chiffre de Vigenère.
 
+    Pour un texte encodé (voir ``encode_text``), les sous-textes sont des
+    vues sur le texte encodé, sans copie.
+
     >>> extract_subtexts("ABCDEFGHIJ", 3)
     ['ADGJ', 'BEH', 'CFI']
     >>> extract_subtexts("LXFOPVEFRNHR", 5)
     ['LVH', 'XER', 'FF', 'OR', 'PN']
+    >>> [subtext.text for subtext in extract_subtexts(encode_text("ABCDEFGHIJ"), 3)]
+    ['ADGJ', 'BEH', 'CFI']
     '''
-    subtexts = [''] * key_length
+    return [ciphertext[i::key_length] for i in range(key_length)]
 
-    for i in range(len(ciphertext)):
-        char = ciphertext[i]
-        subtext_index = i % key_length
-        subtexts[subtext_index] += char
 
-    return subtexts
+class SubstitutionSession:
+    '''
+    Attaque fréquentielle interactive d'un texte chiffré
+    monoalphabétiquement.
+
+    La session garde une clé partielle (lettre chiffrée -> lettre claire)
+    qu'on complète petit à petit avec ``set``, qu'on corrige avec
+    ``unset`` et dont on annule les dernières modifications avec ``undo``.
+    Comme avec ``apply_substitutions``, les lettres déjà substituées sont
+    affichées en minuscules dans ``text``.
+
+    Les positions de chaque lettre chiffrée sont calculées une seule fois :
+    une modification ne touche que les apparitions de la lettre concernée,
+    sans reparcourir tout le texte. Les statistiques du texte affiché
+    (``letter_counts`` et ``digram_counts``) sont mises à jour de la même
+    façon.
+
+    >>> session = SubstitutionSession("MNBBS MN")
+    >>> session.set('M', 'H')
+    >>> session.set('B', 'L')
+    >>> session.text
+    'hNllS hN'
+    >>> session.digram_counts()[:2]
+    [('hN', 2), ('Nl', 1)]
+    >>> session.undo()
+    >>> session.text
+    'hNBBS hN'
+    >>> session.unset('M')
+    >>> session.key
+    {}
+    '''
+
+    def __init__(self, ciphertext: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
+        self.ciphertext = ciphertext
+        self.alphabet = alphabet
+        self._codes = _encode_indices(ciphertext, alphabet)
+        self._positions = [[] for _ in alphabet]
+        for position, code in enumerate(self._codes):
+            if code != _NOT_A_LETTER:
+                self._positions[code].append(position)
+        self._view = list(ciphertext)
+        self._key = {}
+        self._history = []
+        self._letter_counts = Counter({alphabet[i]: len(p) for i, p in enumerate(self._positions) if p})
+        self._digram_counts = Counter(ngram_counts(ciphertext, 2, alphabet))
+
+    @property
+    def text(self) -> str:
+        ''' Texte chiffré où les lettres substituées sont remplacées (en minuscules) '''
+        return ''.join(self._view)
+
+    @property
+    def key(self) -> dict[str, str]:
+        ''' Clé partielle actuelle {lettre chiffrée: lettre claire} '''
+        return {self.alphabet[index]: plain.upper() for index, plain in sorted(self._key.items())}
+
+    def _index(self, letter: str) -> int:
+        if len(letter) != 1 or letter not in self.alphabet:
+            raise ValueError(f"'{letter}' is not a letter of the alphabet")
+        return self.alphabet.index(letter)
+
+    def set(self, ciphered: str, plain: str) -> None:
+        ''' Remplace la lettre chiffrée ``ciphered`` par la lettre claire ``plain`` '''
+        index = self._index(ciphered)
+        if len(plain) != 1:
+            raise ValueError(f"'{plain}' is not a single letter")
+        self._history.append((index, self._key.get(index)))
+        self._assign(index, plain.lower())
+
+    def unset(self, ciphered: str) -> None:
+        ''' Annule la substitution de la lettre chiffrée ``ciphered`` '''
+        index = self._index(ciphered)
+        if index in self._key:
+            self._history.append((index, self._key[index]))
+            self._assign(index, None)
+
+    def undo(self) -> None:
+        ''' Annule la dernière modification faite avec ``set`` ou ``unset`` '''
+        if self._history:
+            index, previous = self._history.pop()
+            self._assign(index, previous)
+
+    def _digram_starts(self, positions: list[int]) -> list[int]:
+        ''' Débuts des bigrammes (deux lettres consécutives) qui touchent une des positions '''
+        codes = self._codes
+        starts = {p - 1 for p in positions if p > 0 and codes[p - 1] != _NOT_A_LETTER}
+        starts.update(p for p in positions if p + 1 < len(codes) and codes[p + 1] != _NOT_A_LETTER)
+        return list(starts)
+
+    def _assign(self, index: int, plain: str | None) -> None:
+        positions = self._positions[index]
+        if plain is None:
+            self._key.pop(index, None)
+            char = self.alphabet[index]
+        else:
+            self._key[index] = plain
+            char = plain
+        if not positions:
+            return
+        view = self._view
+        starts = self._digram_starts(positions)
+        digrams = self._digram_counts
+        for start in starts:
+            digrams[view[start] + view[start + 1]] -= 1
+        self._letter_counts[view[positions[0]]] -= len(positions)
+        for position in positions:
+            view[position] = char
+        self._letter_counts[char] += len(positions)
+        for start in starts:
+            digrams[view[start] + view[start + 1]] += 1
+
+    def letter_counts(self) -> list[tuple[str, int]]:
+        ''' Nombre d'apparitions de chaque lettre du texte affiché, de la plus fréquente à la moins fréquente '''
+        return [(letter, count) for letter, count in self._letter_counts.most_common() if count > 0]
+
+    def digram_counts(self) -> list[tuple[str, int]]:
+        ''' Nombre d'apparitions de chaque bigramme du texte affiché, du plus fréquent au moins fréquent '''
+        return [(digram, count) for digram, count in self._digram_counts.most_common() if count > 0]
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"SubstitutionSession(key={self.key!r})"
 
 
 def apply_substitutions(text: str, **substitutions) -> str:
@@ -207,10 +803,158 @@ def apply_substitutions(text: str, **substitutions) -> str:
     >>> apply_substitutions("MNBBS", M='H', B='L')
     'hNllS'
 
+    Les autres remplacements (nom en minuscule ou de plusieurs lettres,
+    remplacement de plusieurs caractères) sont appliqués tels quels, l'un
+    après l'autre, avec ``str.replace`` :
+
+    >>> apply_substitutions("MNBBS", m='h')
+    'MNBBS'
+    >>> apply_substitutions("MNBBS", BB='LL', S='O')
+    'MNllo'
+
     '''
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    if not all(len(ciphered) == 1 and ciphered in alphabet and len(plain) == 1
+               for ciphered, plain in substitutions.items()):
+        for ciphered, plain in substitutions.items():
+            text = text.replace(ciphered, plain.lower())
+        return text
+    session = SubstitutionSession(text, alphabet)
     for ciphered, plain in substitutions.items():
-        text = text.replace(ciphered, plain.lower())
-    return text
+        session.set(ciphered, plain)
+    return session.text
+
+
+class FrequencyProfile:
+    '''
+    Nombre d'apparitions de chaque lettre d'un texte.
+
+    Le texte n'est parcouru qu'une seule fois : toutes les statistiques
+    (fréquences, indice de coïncidence, caractéristique de Friedman, khi
+    carré) sont ensuite calculées à partir des compteurs, en
+    O(len(alphabet)). On obtient un profil avec ``frequency_profile``.
+
+    Attributs (en lecture seule : un profil peut être partagé par le cache
+    de ``frequency_profile``) :
+
+    - `counts` : nombre d'apparitions de chaque lettre de l'alphabet (tuple)
+    - `length` : nombre total de caractères du texte (lettres ou non)
+    - `alphabet` : l'alphabet utilisé
+
+    >>> profile = frequency_profile("HELLO")
+    >>> profile.counts[ord('L') - ord('A')]
+    2
+    >>> profile.counts[0] = 5
+    Traceback (most recent call last):
+      ...
+    TypeError: 'tuple' object does not support item assignment
+    >>> profile.frequencies()[11]
+    ('L', 40.0)
+    >>> profile.index_of_coincidence()
+    0.1
+    '''
+
+    __slots__ = ('_counts', '_length', '_alphabet')
+
+    def __init__(self, counts, length: int, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
+        self._counts = tuple(counts)
+        self._length = length
+        self._alphabet = alphabet
+
+    @property
+    def counts(self) -> tuple[int, ...]:
+        ''' Nombre d'apparitions de chaque lettre de l'alphabet '''
+        return self._counts
+
+    @property
+    def length(self) -> int:
+        ''' Nombre total de caractères du texte (lettres ou non) '''
+        return self._length
+
+    @property
+    def alphabet(self) -> str:
+        ''' L'alphabet utilisé '''
+        return self._alphabet
+
+    @classmethod
+    def from_text(cls, text: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> 'FrequencyProfile':
+        ''' Compte les lettres de ``text`` (``str`` ou ``EncodedText``) en un seul passage '''
+        if isinstance(text, EncodedText):
+            return cls(_encoded(text, alphabet).letter_counts(), len(text), alphabet)
+        counter = Counter(text)
+        return cls([counter[letter] for letter in alphabet], len(text), alphabet)
+
+    @property
+    def letters(self) -> int:
+        ''' Nombre de caractères du texte qui sont des lettres de l'alphabet '''
+        return sum(self.counts)
+
+    def _probabilities(self) -> list[float]:
+        ''' Fréquence de chaque lettre, entre 0 et 1, par rapport à la longueur du texte '''
+        if self.length == 0:
+            return [0.0] * len(self.counts)
+        return [count / self.length for count in self.counts]
+
+    def frequencies(self) -> list[tuple[str, float]]:
+        ''' Fréquences d'apparition en pourcentage, comme ``letter_frequencies`` '''
+        return [(letter, round(p * 100, 2)) for letter, p in zip(self.alphabet, self._probabilities())]
+
+    def friedman_characteristic(self) -> float:
+        ''' Caractéristique de Friedman, arrondie à 5 chiffres '''
+        uniform = 1 / len(self.alphabet)
+        return round(sum((p - uniform) ** 2 for p in self._probabilities()), 5)
+
+    def index_of_coincidence(self) -> float:
+        ''' Indice de coïncidence, arrondi à 5 chiffres '''
+        N = self.length
+        if N <= 1:
+            return 0.0  # Éviter la division par zéro
+        somme = sum(n * (n - 1) for n in self.counts)
+        return round(somme / (N * (N - 1)), 5)
+
+    def chi_squared(self, language: str = 'french') -> float:
+        '''
+        Khi carré entre les lettres comptées et les fréquences de référence
+        de la langue (voir ``get_frequencies``), arrondi à 5 chiffres. Plus
+        la valeur est petite, plus le texte ressemble à la langue.
+        '''
+        letters = self.letters
+        index = {letter: i for i, letter in enumerate(self.alphabet)}
+        chi2 = 0.0
+        for letter, percentage in get_frequencies(language):
+            expected = letters * percentage / 100
+            if expected > 0:
+                observed = self.counts[index[letter]] if letter in index else 0
+                chi2 += (observed - expected) ** 2 / expected
+        return round(chi2, 5)
+
+    def __add__(self, other: 'FrequencyProfile') -> 'FrequencyProfile':
+        ''' Profil de la concaténation des deux textes (par exemple deux morceaux d'un texte) '''
+        if self.alphabet != other.alphabet:
+            raise ValueError("cannot add profiles with different alphabets")
+        return FrequencyProfile(map(sum, zip(self.counts, other.counts)), self.length + other.length, self.alphabet)
+
+    def __repr__(self):
+        return f"FrequencyProfile(letters={self.letters}, length={self.length}, alphabet={self.alphabet!r})"
+
+
+@lru_cache(maxsize=16)
+def frequency_profile(text: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> FrequencyProfile:
+    '''
+    Retourne le profil de fréquences (``FrequencyProfile``) du texte.
+
+    Les profils des derniers textes analysés sont gardés en cache : appeler
+    successivement ``letter_frequencies``, ``index_of_coincidence`` et
+    ``friedman_characteristic`` sur le même texte ne le parcourt qu'une
+    seule fois. Les profils sont immuables : le même profil peut être
+    retourné à plusieurs appelants sans risque. Le cache garde en mémoire
+    les 16 derniers textes analysés ; ``frequency_profile.cache_clear()``
+    les libère.
+
+    >>> frequency_profile("ABCA", "ABC").frequencies()
+    [('A', 50.0), ('B', 25.0), ('C', 25.0)]
+    '''
+    return FrequencyProfile.from_text(text, alphabet)
 
 
 def letter_frequencies(message: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> list[tuple[str, float]]:
@@ -220,28 +964,91 @@ def letter_frequencies(message: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ
 
     >>> letter_frequencies("ABCA", "ABC")
     [('A', 50.0), ('B', 25.0), ('C', 25.0)]
+    >>> letter_frequencies(encode_text("ABCA", "ABC"), "ABC")
+    [('A', 50.0), ('B', 25.0), ('C', 25.0)]
     >>> letter_frequencies("HELLO WORLD", "ABCDEFGHIJKLMNOPQRSTUVWXYZ")
     [('A', 0.0), ('B', 0.0), ('C', 0.0), ('D', 9.09), ('E', 9.09), ('F', 0.0), ('G', 0.0), ('H', 9.09), ('I', 0.0), ('J', 0.0), ('K', 0.0), ('L', 27.27), ('M', 0.0), ('N', 0.0), ('O', 18.18), ('P', 0.0), ('Q', 0.0), ('R', 9.09), ('S', 0.0), ('T', 0.0), ('U', 0.0), ('V', 0.0), ('W', 9.09), ('X', 0.0), ('Y', 0.0), ('Z', 0.0)]
     '''
-    counters = [0] * len(alphabet)
-    # Comptage des lettres
-    for char in message:
-        if char in alphabet:
-            index = alphabet.index(char)
-            counters[index] += 1
+    return frequency_profile(message, alphabet).frequencies()
 
-    # Calcul des fréquences d'apparition en pourcentage
-    frequencies = []
-    for i in range(len(alphabet)):
-        count = counters[i]
-        letter = alphabet[i]
-        frequency = round(count / len(message) * 100, 2)  # en pourcentage
-        frequencies.append((letter, frequency))
 
-    return frequencies
+def _select_bars(frequencies: list[tuple[str, float]], order_by: str, start: int, nbars: int | None) -> tuple[list[str], list[float]]:
+    ''' Lettres et valeurs des barres à afficher, dans l'ordre choisi '''
+    def order_by_frequency(x):
+        ''' ordre décroissant des fréquences '''
+        return -x[1]
+
+    def order_by_letter(x):
+        ''' ordre alphabétique des lettres '''
+        return x[0]
+
+    nbars = len(frequencies) if nbars is None else nbars
+
+    # Tri selon la méthode choisie
+    if order_by == 'frequency':
+        frequencies = sorted(frequencies, key=order_by_frequency)
+    else:
+        frequencies = sorted(frequencies, key=order_by_letter)
+
+    letters = [item[0] for item in frequencies[start:start+nbars]]
+    values =  [item[1] for item in frequencies[start:start+nbars]]
+    return letters, values
 
 
-def plot_frequencies(frequencies: list[tuple[str, float]], title: str = '', order_by: str = 'frequency', start: int = 0, nbars: int | None = None) -> None:
+def _svg_escape(text: str) -> str:
+    ''' Protège les caractères spéciaux d'un texte placé dans une image SVG '''
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def render_frequencies(frequencies: list[tuple[str, float]], title: str = '', order_by: str = 'frequency',
+                       start: int = 0, nbars: int | None = None, format: str = 'text', width: int = 40) -> str:
+    '''
+    Retourne un graphique des fréquences d'apparition des lettres sans
+    utiliser matplotlib : un graphique en mode texte (``format='text'``) ou
+    une image SVG (``format='svg'``). Les autres paramètres sont ceux de
+    ``plot_frequencies`` ; ``width`` est la longueur de la plus grande barre
+    en mode texte.
+
+    >>> print(render_frequencies([('A', 50.0), ('B', 25.0), ('C', 25.0)], 'ABCA', width=10))
+    Fréquences d'apparition des lettres dans ABCA
+    A  50.0 ##########
+    B  25.0 #####
+    C  25.0 #####
+    >>> render_frequencies([('A', 50.0)], format='svg').startswith('<svg')
+    True
+    '''
+    letters, values = _select_bars(frequencies, order_by, start, nbars)
+    heading = f'Fréquences d\'apparition des lettres dans {title}'
+    highest = max(values, default=0) or 1
+
+    if format == 'text':
+        label_width = max((len(letter) for letter in letters), default=1)
+        lines = [heading]
+        for letter, value in zip(letters, values):
+            bar = '#' * round(value / highest * width)
+            lines.append(f'{letter:<{label_width}} {value:5.1f} {bar}'.rstrip())
+        return '\n'.join(lines)
+
+    if format == 'svg':
+        bar_width, height, margin = 24, 200, 40
+        total_width = margin + bar_width * len(letters) + margin
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{total_width}" height="{height + 2 * margin}" '
+                 f'font-family="sans-serif" font-size="10">',
+                 f'<text x="{total_width / 2}" y="{margin / 2}" text-anchor="middle" font-size="12">{_svg_escape(heading)}</text>']
+        for i, (letter, value) in enumerate(zip(letters, values)):
+            x = margin + i * bar_width
+            bar_height = value / highest * height
+            y = margin + height - bar_height
+            parts.append(f'<rect x="{x + 2}" y="{y:.1f}" width="{bar_width - 4}" height="{bar_height:.1f}" fill="#1f77b4"/>')
+            parts.append(f'<text x="{x + bar_width / 2}" y="{y - 3:.1f}" text-anchor="middle" font-size="8">{value:.1f}</text>')
+            parts.append(f'<text x="{x + bar_width / 2}" y="{margin + height + 12}" text-anchor="middle">{_svg_escape(letter)}</text>')
+        parts.append('</svg>')
+        return '\n'.join(parts)
+
+    raise ValueError(f"Unknown format '{format}'. Known formats: ['text', 'svg']")
+
+
+def plot_frequencies(frequencies: list[tuple[str, float]], title: str = '', order_by: str = 'frequency', start: int = 0, nbars: int | None = None, backend: str = 'auto') -> None:
     '''
     Affiche un graphique des fréquences d'apparition des lettres
 
@@ -253,25 +1060,28 @@ def plot_frequencies(frequencies: list[tuple[str, float]], title: str = '', orde
         sinon : trier par ordre alphabétique des lettres
     - `start` : indiquer à partir de quelle barre afficher (utile si beaucoup de barres, pour digrammes)
     - `nbars` : nombre de barres à afficher (utile si beaucoup de barres, pour digrammes)
+    - `backend` :
+        'matplotlib' => graphique matplotlib (à installer séparément : ``pip install csud[plot]``)
+        'text' => graphique en mode texte, affiché avec ``print`` (voir ``render_frequencies``)
+        'auto' => matplotlib s'il est installé, sinon mode texte (par défaut)
     '''
-    def order_by_frequency(x):
-        ''' ordre décroissant des fréquences '''
-        return -x[1]
-
-    def order_by_letter(x):
-        ''' ordre alphabétique des lettres '''
-        return ord(x[0])
-
-    nbars = len(frequencies) if nbars is None else nbars
+    if backend == 'auto':
+        try:
+            import matplotlib.pyplot as plt
+        except ImportError:
+            backend = 'text'
+        else:
+            backend = 'matplotlib'
+    if backend == 'text':
+        print(render_frequencies(frequencies, title, order_by, start, nbars))
+        return
+    if backend != 'matplotlib':
+        raise ValueError(f"Unknown backend '{backend}'. Known backends: ['auto', 'matplotlib', 'text']")
 
-    # Tri selon la méthode choisie
-    if order_by == 'frequency':
-        frequencies.sort(key=order_by_frequency)
-    else:
-        frequencies.sort(key=order_by_letter)
+    # matplotlib n'est chargé qu'au premier graphique : importer csud.crypto reste rapide
+    import matplotlib.pyplot as plt
 
-    letters = [item[0] for item in frequencies[start:start+nbars]]
-    values =  [item[1] for item in frequencies[start:start+nbars]]
+    letters, values = _select_bars(frequencies, order_by, start, nbars)
 
     # Créer une figure avec une meilleure résolution
     plt.figure(figsize=(8, 6), dpi=100)
@@ -302,12 +1112,18 @@ def get_frequencies(language: str = 'french') -> list[tuple[str, float]]:
     
     Retourne les fréquences d'apparition des lettres en fonction de la langue.
     
-    Langues disponibles : 'french' (par défaut)
+    Langues disponibles : 'french' (par défaut) et les langues des textes
+    de référence de ``csud.corpus`` ('german'), dont les fréquences sont
+    précalculées. Ces fréquences correspondent à des textes préparés avec la
+    table de repli ``csud.corpus.FOLDINGS[language]`` ('german_legacy' pour
+    l'allemand).
     
     >>> get_frequencies('french')[0:5]
     [('A', 8.15), ('B', 0.97), ('C', 3.15), ('D', 3.73), ('E', 17.39)]
     >>> get_frequencies('french')[0]
     ('A', 8.15)
+    >>> max(get_frequencies('german'), key=lambda item: item[1])[0]
+    'E'
     
     '''
     
@@ -317,46 +1133,147 @@ def get_frequencies(language: str = 'french') -> list[tuple[str, float]]:
     }
     if language in KNOWN_FREQUENCIES:
         return KNOWN_FREQUENCIES[language]
-    else:
-        raise ValueError(f"Unknown language '{language}'. Known languages: {list(KNOWN_FREQUENCIES.keys())}")
+
+    from csud.corpus import languages
+    if language in languages():
+        return _corpus_frequencies(language)
+    known = list(dict.fromkeys([*KNOWN_FREQUENCIES, *languages()]))
+    raise ValueError(f"Unknown language '{language}'. Known languages: {known}")
 
 
-def prepare(text: str) -> str:
+@lru_cache(maxsize=None)
+def _corpus_frequencies(language: str) -> list[tuple[str, float]]:
+    ''' Fréquences des lettres calculées à partir des comptes précalculés de ``csud.corpus`` '''
+    from csud.corpus import ngram_reference
+    alphabet, counts = ngram_reference(language, 1)
+    total = sum(counts.values())
+    return [(letter, round(counts.get(i, 0) / total * 100, 2)) for i, letter in enumerate(alphabet)]
+
+
+def reference_ngram_counts(language: str = 'french', n: int = 2, dense: bool = False) -> dict[str, int] | list[int]:
+    '''
+    Retourne les comptes précalculés des n-grammes (n = 1, 2 ou 4) des
+    textes de référence de la langue ``language``, sous la même forme que
+    ``ngram_counts``. Les textes eux-mêmes ne sont pas chargés.
+
+    >>> counts = reference_ngram_counts('french', 2)
+    >>> max(counts, key=counts.get)
+    'ES'
+    '''
+    from csud.corpus import ngram_reference
+    alphabet, counts = ngram_reference(language, n)
+    if dense:
+        result = [0] * len(alphabet) ** n
+        for code, count in counts.items():
+            result[code] = count
+        return result
+    ngram_of = _ngram_decoder(alphabet, n)
+    return {ngram_of(code): counts[code] for code in sorted(counts)}
+
+
+# Tables de repli utilisées par ``prepare`` : chaque caractère d'un groupe
+# est remplacé par les lettres indiquées. Les majuscules correspondantes
+# sont traitées de la même façon.
+_FOLDINGS = {
+    'french': {
+        'éèëê': 'E',
+        'áàâä': 'A',
+        'ûùü': 'U',
+        'îïì': 'I',
+        'öôò': 'O',
+        'ç': 'C',
+        'œ': 'OE',
+    },
+}
+_FOLDINGS['german'] = {
+    **_FOLDINGS['french'],
+    'ä': 'AE',
+    'ö': 'OE',
+    'ü': 'UE',
+    'ßẞ': 'SS',
+}
+# Repli des textes de référence allemands de ``csud.corpus`` (et de leurs
+# statistiques) : ä -> A, ö -> O, ü -> U, ß supprimé (« STRAE »)
+_FOLDINGS['german_legacy'] = {
+    **_FOLDINGS['french'],
+    'ßẞ': '',
+}
+
+# Caractères dont la minuscule est une lettre latine (İ -> i̇, signe Kelvin -> k)
+_SPECIAL_CASES = {'İ': 'I', '\u212a': 'K'}
+
+
+def register_folding(language: str, folding: dict[str, str], base: str | None = None) -> None:
+    '''
+    Ajoute (ou remplace) la table de repli de la langue ``language`` pour
+    ``prepare``. Chaque clé de ``folding`` est un groupe de caractères
+    remplacés par la valeur associée (des lettres majuscules de A à Z). Avec
+    ``base``, la table complète celle d'une langue déjà connue.
+
+    >>> register_folding('spanish', {'ñ': 'N', 'í': 'I', 'ó': 'O', 'ú': 'U'}, base='french')
+    >>> prepare('Año', language='spanish')
+    'ANO'
+    '''
+    for replacement in folding.values():
+        if replacement and not (replacement.isascii() and replacement.isalpha() and replacement.isupper()):
+            raise ValueError(f"replacement '{replacement}' must contain only letters from A to Z")
+    _FOLDINGS[language] = {**_FOLDINGS[base], **folding} if base is not None else dict(folding)
+    _folding_table.cache_clear()
+
+
+@lru_cache(maxsize=16)
+def _folding_table(language: str) -> dict[int, str | None]:
+    ''' Table pour ``str.translate`` qui prépare un texte dans la langue ``language`` '''
+    if language not in _FOLDINGS:
+        raise ValueError(f"Unknown language '{language}'. Known languages: {list(_FOLDINGS)}")
+    # Caractères ASCII : lettres en majuscules, le reste est supprimé
+    table = {code: (chr(code).upper() if chr(code).isalpha() else None) for code in range(128)}
+    # Un groupe peut remplacer un groupe précédent (par exemple 'ä' -> 'AE'
+    # pour l'allemand), majuscules comprises ; seuls les caractères ASCII et
+    # ceux indiqués explicitement ne sont jamais remplacés par une majuscule.
+    explicit = set()
+    for chars, replacement in [*_SPECIAL_CASES.items(), *_FOLDINGS[language].items()]:
+        for char in chars:
+            table[ord(char)] = replacement
+            explicit.add(char)
+        for char in chars:
+            upper = char.upper()
+            if len(upper) == 1 and not upper.isascii() and upper not in explicit:
+                table[ord(upper)] = replacement
+    return table
+
+
+def prepare(text: str, language: str = 'french', decompose: bool = False) -> str:
     '''
 
     Prepares the text to be encrypted by stripping away the
     spaces, punctuation and non latin characters.
 
+    Accented letters and ligatures are folded with the table of
+    ``language`` ('french', 'german', or 'german_legacy' for the German
+    reference texts of ``csud.corpus``; see ``register_folding``). With
+    ``decompose=True``, the other accented letters are reduced to their
+    base letter using the Unicode decomposition instead of being removed.
+
     >>> prepare('salut')
     'SALUT'
     >>> prepare("Il m'a toujours impressionné![]{}?")
     'ILMATOUJOURSIMPRESSIONNE'
+    >>> prepare("Die Straße zur Tragödie", language='german')
+    'DIESTRASSEZURTRAGOEDIE'
+    >>> prepare("Ärger mit Öl und Übermut", language='german')
+    'AERGERMITOELUNDUEBERMUT'
+    >>> prepare("Die Straße zur Tragödie", language='german_legacy')
+    'DIESTRAEZURTRAGODIE'
+    >>> prepare("Mañana à São Paulo", decompose=True)
+    'MANANAASAOPAULO'
     '''
-    alphabet='ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-    result = ''
-    # tout mettre en majuscules
-    text = text.lower()
-    for c in text:
-        if c in alphabet + alphabet.lower():
-            c = c
-        elif c in 'éèëê':
-            c = 'E'
-        elif c in 'áàâä':
-            c = 'A'
-        elif c in 'ûùü':
-            c = 'U'
-        elif c in 'îïì':
-            c = 'I'
-        elif c in 'öôò':
-            c = 'O'
-        elif c in 'ç':
-            c = 'C'
-        elif c in 'œ':
-            c = 'OE'
-        else:
-            c = ''
-        result += c
-    return result.upper()
+    table = _folding_table(language)
+    result = text.translate(table)
+    if decompose and not result.isascii():
+        result = unicodedata.normalize('NFKD', result).translate(table)
+    # Les caractères non ASCII qui restent ne sont pas des lettres connues
+    return result.encode('ascii', 'ignore').decode('ascii')
 
 
 def load_text(filename: str) -> str:
@@ -369,6 +1286,160 @@ def load_text(filename: str) -> str:
         return file.read()
 
 
+def iter_text(filename: str, chunk_size: int = 1 << 20) -> Iterator[str]:
+    '''
+    Lit le fichier `filename` morceau par morceau (au plus `chunk_size`
+    caractères à la fois), sans jamais le charger entièrement en mémoire.
+
+    Le décodage UTF-8 est incrémental : un caractère codé sur plusieurs
+    octets n'est jamais coupé entre deux morceaux.
+
+    Exemple: for chunk in iter_text('fichier.txt'): ...
+    '''
+    with open(filename, 'r', encoding='utf-8') as file:
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+def iter_prepare(chunks: Iterable[str], language: str = 'french', decompose: bool = False) -> Iterator[str]:
+    '''
+    Version morceau par morceau de ``prepare`` : la concaténation des
+    morceaux produits est identique à ``prepare`` appliqué au texte entier.
+
+    ``prepare`` traite chaque caractère indépendamment de ses voisins (une
+    ligature comme 'œ' est un seul caractère, et les accents combinants
+    sont supprimés), le découpage en morceaux ne change donc pas le
+    résultat.
+
+    >>> ''.join(iter_prepare(["Il m'a toujours impr", "essionné !"]))
+    'ILMATOUJOURSIMPRESSIONNE'
+    '''
+    for chunk in chunks:
+        prepared = prepare(chunk, language, decompose)
+        if prepared:
+            yield prepared
+
+
+class NgramCounter:
+    '''
+    Compteur de n-grammes qu'on alimente morceau par morceau avec
+    ``update``.
+
+    Les ``n - 1`` derniers caractères de chaque morceau sont conservés pour
+    compter les n-grammes à cheval sur deux morceaux : les résultats sont
+    identiques à ceux des fonctions qui travaillent sur le texte entier,
+    et la mémoire utilisée ne dépend pas de la longueur du texte.
+
+    >>> counter = NgramCounter(2, "ABC")
+    >>> counter.update("ABA")
+    >>> counter.update("BBA")
+    >>> counter.counts()
+    {'AB': 2, 'BA': 2, 'BB': 1}
+    >>> counter.frequencies() == digram_frequencies("ABABBA", "ABC")
+    True
+    >>> counter = NgramCounter(4)
+    >>> for char in "ABCDEFG":
+    ...     counter.update(char)
+    >>> counter.counts()
+    {'ABCD': 1, 'BCDE': 1, 'CDEF': 1, 'DEFG': 1}
+    '''
+
+    def __init__(self, n: int = 1, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
+        if n < 1:
+            raise ValueError(f"n must be at least 1, not {n}")
+        self.n = n
+        self.alphabet = alphabet
+        self.length = 0
+        self._counts = Counter()
+        self._tail = ''
+
+    def update(self, chunk: str) -> None:
+        ''' Ajoute le morceau de texte ``chunk`` aux compteurs '''
+        self.length += len(chunk)
+        text = self._tail + chunk
+        self._counts.update(_ngram_code_counts(_encode_indices(text, self.alphabet), self.n, len(self.alphabet)))
+        self._tail = text[-(self.n - 1):] if self.n > 1 else ''
+
+    def counts(self, dense: bool = False) -> dict[str, int] | list[int]:
+        ''' Nombre d'apparitions des n-grammes, sous la même forme que ``ngram_counts`` '''
+        if dense:
+            result = [0] * len(self.alphabet) ** self.n
+            for code, count in self._counts.items():
+                result[code] = count
+            return result
+        ngram_of = _ngram_decoder(self.alphabet, self.n)
+        return {ngram_of(code): self._counts[code] for code in sorted(self._counts)}
+
+    def profile(self) -> FrequencyProfile:
+        ''' Profil de fréquences du texte (seulement pour n = 1) '''
+        if self.n != 1:
+            raise ValueError("a frequency profile needs a letter counter (n = 1)")
+        return FrequencyProfile(self.counts(dense=True), self.length, self.alphabet)
+
+    def frequencies(self) -> list[tuple[str, float]]:
+        '''
+        Fréquences d'apparition en pourcentage, comme ``letter_frequencies``
+        (n = 1) ou ``digram_frequencies`` (n = 2)
+        '''
+        if self.n == 1:
+            return self.profile().frequencies()
+        total = self.length - self.n + 1
+        return [(ngram, round(count / total * 100, 2) if total > 0 else 0.0)
+                for ngram, count in zip(generate_ngrams(self.alphabet, self.n), self.counts(dense=True))]
+
+
+def _count_chunks(chunks: Iterable[str], n: int, alphabet: str) -> NgramCounter:
+    ''' Alimente un ``NgramCounter`` avec tous les morceaux '''
+    counter = NgramCounter(n, alphabet)
+    for chunk in chunks:
+        counter.update(chunk)
+    return counter
+
+
+def stream_letter_frequencies(chunks: Iterable[str], alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> list[tuple[str, float]]:
+    '''
+    Comme ``letter_frequencies``, pour un texte fourni morceau par morceau
+    (par exemple par ``iter_text``).
+
+    >>> stream_letter_frequencies(["AB", "CA"], "ABC")
+    [('A', 50.0), ('B', 25.0), ('C', 25.0)]
+    '''
+    return _count_chunks(chunks, 1, alphabet).frequencies()
+
+
+def stream_digram_frequencies(chunks: Iterable[str], alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> list[tuple[str, float]]:
+    '''
+    Comme ``digram_frequencies``, pour un texte fourni morceau par morceau
+    (par exemple par ``iter_text``).
+
+    >>> stream_digram_frequencies(["AB", "AB", "BA"], "AB")
+    [('AA', 0.0), ('AB', 40.0), ('BA', 40.0), ('BB', 20.0)]
+    '''
+    return _count_chunks(chunks, 2, alphabet).frequencies()
+
+
+def stream_ngram_counts(chunks: Iterable[str], n: int = 2, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', dense: bool = False) -> dict[str, int] | list[int]:
+    '''
+    Comme ``ngram_counts``, pour un texte fourni morceau par morceau
+    (par exemple par ``iter_text``).
+
+    Exemple: quadgrams = stream_ngram_counts(iter_prepare(iter_text('fichier.txt')), 4)
+    '''
+    return _count_chunks(chunks, n, alphabet).counts(dense)
+
+
+def stream_profile(chunks: Iterable[str], alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> FrequencyProfile:
+    '''
+    Profil de fréquences (voir ``frequency_profile``) d'un texte fourni
+    morceau par morceau, pour calculer par exemple son indice de
+    coïncidence sans le charger en mémoire.
+
+    >>> stream_profile(["HEL", "LO"]).index_of_coincidence()
+    0.1
+    '''
+    return _count_chunks(chunks, 1, alphabet).profile()
+
+
 def friedman_characteristic(text: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> float:
     '''
     Calcule la caractéristique de Friedman pour le texte donné, arrondie à 5 chiffres.
@@ -378,15 +1449,7 @@ def friedman_characteristic(text: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWX
     >>> friedman_characteristic("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
     0.0
     '''
-    # Calcul des fréquences des lettres dans le texte
-    freqs: list[tuple[str, float]] = letter_frequencies(text, alphabet)
-    # Calcul de la caractéristique de Friedman en utilisant la formule
-    cf = 0.0
-    for i in range(len(alphabet)):
-        f_x = freqs[i][1]  # Fréquence de la lettre i
-        f_x /= 100  # Convertir en probabilité entre 0 et 1
-        cf += (f_x - 1/len(alphabet)) ** 2
-    return round(cf, 5)
+    return frequency_profile(text, alphabet).friedman_characteristic()
 
 
 def index_of_coincidence(text: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> float:
@@ -398,18 +1461,993 @@ def index_of_coincidence(text: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
     >>> index_of_coincidence("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
     0.0
     '''
-    freqs: list[tuple[str, float]] = letter_frequencies(text, alphabet)
-    N: int = len(text)  # Nombre total de lettres
-    if N <= 1:
-        return 0.0  # Éviter la division par zéro
-
-    somme: float = 0.0
-    for i in range(len(alphabet)):
-        f_x: float = freqs[i][1]  # Fréquence de la lettre i
-        f_x /= 100  # Convertir en probabilité entre 0 et 1
-        n_x: int = int(round(f_x * N))  # Convertir en nombre d'occurrences
-        somme += n_x * (n_x - 1)  # Calcul de la contribution de chaque lettre
-    return round(somme / (N * (N - 1)), 5)
+    return frequency_profile(text, alphabet).index_of_coincidence()
+
+
+def chi_squared(text: str, language: str = 'french', alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> float:
+    '''
+    Calcule le khi carré entre les fréquences des lettres du texte et
+    celles de la langue ``language``, arrondi à 5 chiffres. Plus la valeur
+    est petite, plus le texte ressemble à la langue.
+
+    >>> chi_squared("LECHATESTSURLETAPIS") < chi_squared("XKCDWQZYJXKWQZ")
+    True
+    '''
+    return frequency_profile(text, alphabet).chi_squared(language)
+
+
+def _rolling_sums(text: str, window: int, step: int, alphabet: str) -> Iterator[tuple[int, int, int]]:
+    '''
+    Fait glisser une fenêtre de ``window`` caractères sur ``text``, de
+    ``step`` en ``step`` caractères, et produit pour chaque position
+    ``(début, somme des carrés des compteurs, nombre de lettres)``.
+
+    Les compteurs sont mis à jour à chaque caractère qui entre ou sort de la
+    fenêtre : (n + 1)² - n² = 2n + 1, donc la somme des carrés se met à jour
+    en O(1) et tout le texte est parcouru en O(len(text)).
+    '''
+    if window < 1:
+        raise ValueError(f"window must be at least 1, not {window}")
+    if step < 1:
+        raise ValueError(f"step must be at least 1, not {step}")
+    codes = _encode_indices(text, alphabet)
+    counts = [0] * 256
+    squares = letters = 0
+    for code in codes[:window]:
+        if code != _NOT_A_LETTER:
+            squares += 2 * counts[code] + 1
+            counts[code] += 1
+            letters += 1
+    start = 0
+    while start + window <= len(codes):
+        yield start, squares, letters
+        for leaving, entering in zip(codes[start:start + step], codes[start + window:start + window + step]):
+            if leaving != _NOT_A_LETTER:
+                counts[leaving] -= 1
+                squares -= 2 * counts[leaving] + 1
+                letters -= 1
+            if entering != _NOT_A_LETTER:
+                squares += 2 * counts[entering] + 1
+                counts[entering] += 1
+                letters += 1
+        start += step
+
+
+def rolling_ic(text: str, window: int, step: int = 1,
+               alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> Iterator[tuple[int, float]]:
+    '''
+    Indice de coïncidence de chaque fenêtre de ``window`` caractères du
+    texte, de ``step`` en ``step`` caractères. Produit les couples
+    ``(début de la fenêtre, indice)`` ; chaque indice est celui que
+    donnerait ``index_of_coincidence(text[début:début + window])``, mais le
+    texte n'est parcouru qu'une seule fois.
+
+    >>> list(rolling_ic("AABBCC", 4, 2))
+    [(0, 0.33333), (2, 0.33333)]
+    >>> [ic for _, ic in rolling_ic("ABABAAAA", 4)] == [index_of_coincidence("ABABAAAA"[i:i + 4]) for i in range(5)]
+    True
+    '''
+    if window <= 1:
+        for start, _, _ in _rolling_sums(text, window, step, alphabet):
+            yield start, 0.0
+        return
+    pairs = window * (window - 1)
+    for start, squares, letters in _rolling_sums(text, window, step, alphabet):
+        # somme de n(n - 1) = somme des n² - somme des n
+        yield start, round((squares - letters) / pairs, 5)
+
+
+def rolling_friedman(text: str, window: int, step: int = 1,
+                     alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> Iterator[tuple[int, float]]:
+    '''
+    Caractéristique de Friedman de chaque fenêtre de ``window`` caractères
+    du texte, de ``step`` en ``step`` caractères, comme ``rolling_ic``.
+
+    >>> list(rolling_friedman("HELLOHELLO", 5, 5))
+    [(0, 0.24154), (5, 0.24154)]
+    '''
+    size = len(alphabet)
+    for start, squares, letters in _rolling_sums(text, window, step, alphabet):
+        # somme de (n/w - 1/m)² = somme des n² / w² - 2 * lettres / (m w) + 1/m
+        yield start, round(squares / window ** 2 - 2 * letters / (size * window) + 1 / size, 5)
+
+
+def deviating_segments(text: str, window: int = 200, step: int | None = None, language: str = 'french',
+                       statistic: str = 'ic', tolerance: float = 0.3) -> list[tuple[int, int]]:
+    '''
+    Cherche les passages du texte dont les statistiques s'écartent de celles
+    de la langue ``language`` (voir ``get_frequencies``) : par exemple un
+    passage chiffré, ou écrit dans une autre langue.
+
+    La statistique (``'ic'`` pour l'indice de coïncidence ou ``'friedman'``
+    pour la caractéristique de Friedman) est calculée sur des fenêtres
+    glissantes (``rolling_ic``, ``rolling_friedman``, avec par défaut un pas
+    d'un quart de fenêtre). Une fenêtre s'écarte de la langue si sa valeur
+    diffère de la valeur de référence de plus de ``tolerance`` (en
+    proportion). Les fenêtres qui se suivent ou se chevauchent sont
+    regroupées en segments ``(début, fin)``.
+
+    Le texte doit être préparé (voir ``prepare``) : les caractères qui ne
+    sont pas des lettres font baisser les deux statistiques.
+
+    >>> plain = prepare("Le chat du voisin et le chat de la voisine jouent avec le chat "
+    ...                 "du village pendant que le chien du voisin dort") * 4
+    >>> secret = vigenere(plain, 'CRYPTOGRAPHIE')
+    >>> len(plain)
+    348
+    >>> deviating_segments(plain + secret + plain, window=100)
+    [(300, 750)]
+    '''
+    alphabet, probabilities = _reference_probabilities(language)
+    if statistic == 'ic':
+        reference = sum(p * p for p in probabilities)
+        values = rolling_ic(text, window, step or max(window // 4, 1), alphabet)
+    elif statistic == 'friedman':
+        uniform = 1 / len(alphabet)
+        reference = sum((p - uniform) ** 2 for p in probabilities)
+        values = rolling_friedman(text, window, step or max(window // 4, 1), alphabet)
+    else:
+        raise ValueError(f"Unknown statistic '{statistic}'. Known statistics: ['ic', 'friedman']")
+
+    segments = []
+    for start, value in values:
+        if abs(value - reference) <= tolerance * reference:
+            continue
+        if segments and start <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], start + window)
+        else:
+            segments.append((start, start + window))
+    return segments
+
+
+class KasiskiResult:
+    '''
+    Résultat de l'examen de Kasiski (voir ``kasiski``).
+
+    Attributs :
+
+    - `repeats` : séquences répétées et leurs positions [(séquence, [positions])]
+    - `distances` : distances entre deux apparitions successives d'une même séquence
+    - `gcd` : plus grand diviseur commun de toutes les distances
+    - `factors` : pour chaque longueur de clé k, nombre de distances divisibles par k [(k, nombre)]
+    - `key_lengths` : longueurs de clé les plus probables, de la meilleure à la moins bonne
+    '''
+
+    def __init__(self, repeats, distances, factors, key_lengths):
+        self.repeats = repeats
+        self.distances = distances
+        self.gcd = gcd(*distances)
+        self.factors = factors
+        self.key_lengths = key_lengths
+
+    def __repr__(self):
+        return (f"KasiskiResult(repeats={len(self.repeats)}, distances={len(self.distances)}, "
+                f"gcd={self.gcd}, key_lengths={self.key_lengths[:5]})")
+
+
+def _suffix_array(letters: bytes, prefix: int = 16) -> list[int]:
+    '''
+    Positions des suffixes de ``letters`` dans l'ordre alphabétique
+    (tableau des suffixes).
+
+    Les suffixes sont d'abord triés selon leurs ``prefix`` premières
+    lettres. Seuls les groupes de suffixes encore égaux sont ensuite
+    départagés, en doublant à chaque tour la longueur comparée : deux
+    suffixes égaux sur k lettres sont ordonnés par le rang des suffixes qui
+    commencent k lettres plus loin. Dans un texte naturel, presque tous les
+    suffixes sont séparés dès le premier tri.
+    '''
+    n = len(letters)
+    heads = [letters[i:i + prefix] for i in range(n)]
+    order = sorted(range(n), key=heads.__getitem__)
+    # rang d'un suffixe = position du premier suffixe de son groupe
+    rank = [0] * n
+    groups = []
+    start = 0
+    for i in range(1, n + 1):
+        if i == n or heads[order[i]] != heads[order[start]]:
+            for p in order[start:i]:
+                rank[p] = start
+            if i - start > 1:
+                groups.append((start, order[start:i]))
+            start = i
+    del heads
+
+    k = prefix
+    while groups:
+        # Les nouveaux rangs ne sont écrits qu'après le tri de tous les
+        # groupes, qui utilise les rangs du tour précédent
+        updates = []
+        for first, members in groups:
+            keyed = sorted([(rank[p + k] if p + k < n else -1, p) for p in members])
+            previous = None
+            for offset, (key, p) in enumerate(keyed):
+                order[first + offset] = p
+                if key != previous:
+                    updates.append((first + offset, []))
+                    previous = key
+                updates[-1][1].append(p)
+        groups = []
+        for first, members in updates:
+            for p in members:
+                rank[p] = first
+            if len(members) > 1:
+                groups.append((first, members))
+        k *= 2
+    return order
+
+
+def _lcp_array(letters: bytes, suffixes: list[int]) -> list[int]:
+    '''
+    Longueur du plus long préfixe commun de chaque suffixe et du précédent
+    dans le tableau des suffixes (algorithme de Kasai, en temps linéaire).
+    '''
+    n = len(suffixes)
+    rank = [0] * n
+    for i, p in enumerate(suffixes):
+        rank[p] = i
+    lcp = [0] * n
+    h = 0
+    for p in range(n):
+        r = rank[p]
+        if r == 0:
+            h = 0
+            continue
+        q = suffixes[r - 1]
+        while p + h < n and q + h < n and letters[p + h] == letters[q + h]:
+            h += 1
+        lcp[r] = h
+        if h:
+            h -= 1
+    return lcp
+
+
+def kasiski(ciphertext: str, min_len: int = 3, max_key_length: int = 20,
+            alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> KasiskiResult:
+    '''
+    Examen de Kasiski d'un texte chiffré avec le chiffre de Vigenère : les
+    séquences d'au moins ``min_len`` lettres qui se répètent sont souvent le
+    même morceau de texte chiffré avec la même partie de la clé, et leur
+    distance est alors un multiple de la longueur de la clé.
+
+    Les séquences répétées sont trouvées avec le tableau des suffixes du
+    texte et celui des plus longs préfixes communs : chaque intervalle du
+    tableau des suffixes dont les suffixes ont au moins ``min_len`` lettres
+    en commun est une séquence répétée, qu'on ne prolonge plus vers la
+    droite. Une séquence n'est gardée que si ses apparitions ne sont pas
+    toutes précédées de la même lettre (sinon, elle fait partie d'une
+    séquence répétée plus longue). Toutes les séquences répétées maximales
+    sont ainsi trouvées, même celles qui font partie d'une répétition plus
+    courte mais plus fréquente, en temps quasi linéaire. Chaque paire
+    d'apparitions successives ne compte qu'une fois dans les distances.
+
+    Les positions ne comptent que les lettres (les autres caractères sont
+    ignorés), comme pour ``extract_subtexts``. Les longueurs de clé
+    candidates sont classées selon la part des distances qu'elles divisent,
+    au-delà de ce que le hasard donnerait (1 distance sur k).
+
+    >>> plain = prepare("Le chat du voisin et le chat de la voisine jouent avec le chat "
+    ...                 "du village pendant que le chien du voisin dort")
+    >>> ciphertext = vigenere(plain, 'CLE')
+    >>> result = kasiski(ciphertext)
+    >>> result.repeats[:2]
+    [('FFZQTWKY', [6, 75]), ('ZQTWKYI', [8, 26])]
+    >>> result.key_lengths[:3]
+    [3, 9, 18]
+    >>> len(extract_subtexts(ciphertext, result.key_lengths[0]))
+    3
+    >>> kasiski('ABCDEFGQQWERTYUABCDEFGZZPLMNBVCXABCXX').repeats
+    [('ABCDEFG', [0, 15]), ('ABC', [0, 15, 32])]
+    >>> kasiski(vigenere(plain * 50, 'CLE')).key_lengths[0]
+    3
+    '''
+    if min_len < 1:
+        raise ValueError(f"min_len must be at least 1, not {min_len}")
+    letters = _letters_only(ciphertext, alphabet)
+    text = _decode_indices(letters, alphabet)
+    suffixes = _suffix_array(letters)
+    lcp = _lcp_array(letters, suffixes)
+
+    # Parcours des intervalles du tableau des suffixes avec une pile de
+    # [longueur commune, début, lettre qui précède]. La lettre qui précède
+    # vaut EMPTY tant que l'intervalle n'a pas de suffixe, MIXED si ses
+    # suffixes ne sont pas tous précédés de la même lettre.
+    EMPTY, MIXED = -2, -1
+
+    def merge(a: int, b: int) -> int:
+        if a == EMPTY or a == b:
+            return b
+        return a if b == EMPTY else MIXED
+
+    repeats = []
+    pairs = set()
+    stack = [[-1, 0, EMPTY], [0, 0, EMPTY]]
+    for i in range(1, len(suffixes) + 1):
+        common = lcp[i] if i < len(suffixes) else -1
+        # Les intervalles de moins de min_len lettres communes sont ignorés
+        if 0 <= common < min_len:
+            common = 0
+            if stack[-1][0] == 0:
+                continue
+        p = suffixes[i - 1]
+        before = letters[p - 1] if p > 0 else MIXED
+        if common > stack[-1][0]:
+            stack.append([common, i - 1, before])
+            continue
+        stack[-1][2] = merge(stack[-1][2], before)
+        while common < stack[-1][0]:
+            length, first, previous = stack.pop()
+            if length >= min_len and previous == MIXED:
+                starts = sorted(suffixes[first:i])
+                repeats.append((text[starts[0]:starts[0] + length], starts))
+                pairs.update(zip(starts, starts[1:]))
+            if common <= stack[-1][0]:
+                stack[-1][2] = merge(stack[-1][2], previous)
+            else:
+                stack.append([common, first, previous])
+    distances = [b - a for a, b in sorted(pairs)]
+    repeats.sort(key=lambda repeat: (-len(repeat[0]), repeat[1][0]))
+
+    # Histogramme des diviseurs des distances
+    distance_counts = Counter(distances)
+    factors = []
+    for key_length in range(2, max_key_length + 1):
+        count = sum(n for distance, n in distance_counts.items() if distance % key_length == 0)
+        factors.append((key_length, count))
+    excess = {k: count / len(distances) - 1 / k for k, count in factors} if distances else {}
+    key_lengths = sorted((k for k in excess if excess[k] > 0), key=lambda k: -excess[k])
+    return KasiskiResult(repeats, distances, factors, key_lengths)
+
+
+def _letter_counts(text: str, alphabet: str) -> list[int]:
+    ''' Nombre d'apparitions de chaque lettre de l'alphabet (majuscule ou minuscule) dans ``text`` '''
+    counter = Counter(_letters_only(text, alphabet))
+    return [counter[i] for i in range(len(alphabet))]
+
+
+def _chi_squared_counts(observed: list[int], probabilities: list[float]) -> float:
+    ''' Khi carré entre des compteurs et une distribution de référence '''
+    total = sum(observed)
+    chi2 = 0.0
+    for count, probability in zip(observed, probabilities):
+        expected = total * probability
+        if expected > 0:
+            chi2 += (count - expected) ** 2 / expected
+    return chi2
+
+
+def rank_caesar(ciphertext: str, language: str = 'french', top: int = 3) -> list[tuple[int, str, float]]:
+    '''
+    Essaie tous les décalages du chiffre de César et retourne les ``top``
+    meilleurs candidats ``(décalage, texte déchiffré, score)``.
+
+    Les lettres du texte chiffré ne sont comptées qu'une fois : pour chaque
+    décalage, les compteurs du texte déchiffré sont ceux du texte chiffré,
+    décalés. Le score est le khi carré par rapport aux fréquences de la
+    langue ``language`` (plus petit = meilleur) ; seuls les meilleurs
+    candidats sont déchiffrés.
+
+    >>> shift, text, score = rank_caesar(caesar("Rendez-vous demain matin devant la gare", 7))[0]
+    >>> shift, text
+    (7, 'RENDEZ-VOUS DEMAIN MATIN DEVANT LA GARE')
+    '''
+    alphabet, probabilities = _reference_probabilities(language)
+    size = len(alphabet)
+    counts = _letter_counts(ciphertext, alphabet)
+    scores = [(_chi_squared_counts(counts[shift:] + counts[:shift], probabilities), shift)
+              for shift in range(size)]
+    return [(shift, caesar(ciphertext, shift, decrypt=True, alphabet=alphabet), round(score, 5))
+            for score, shift in sorted(scores)[:top]]
+
+
+def rank_affine(ciphertext: str, language: str = 'french', top: int = 3) -> list[tuple[tuple[int, int], str, float]]:
+    '''
+    Essaie toutes les clés ``(a, b)`` du chiffre affine (312 clés pour 26
+    lettres) et retourne les ``top`` meilleurs candidats ``((a, b), texte
+    déchiffré, score)``.
+
+    Comme pour ``rank_caesar``, le texte chiffré n'est compté qu'une fois et
+    chaque clé est évaluée en permutant ses compteurs ; le score est le khi
+    carré par rapport à la langue ``language`` (plus petit = meilleur).
+
+    >>> key, text, score = rank_affine(affine("Rendez-vous demain matin devant la gare", 5, 8))[0]
+    >>> key, text
+    ((5, 8), 'RENDEZ-VOUS DEMAIN MATIN DEVANT LA GARE')
+    '''
+    alphabet, probabilities = _reference_probabilities(language)
+    size = len(alphabet)
+    counts = _letter_counts(ciphertext, alphabet)
+    scores = []
+    for a in range(1, size):
+        if gcd(a, size) != 1:
+            continue
+        for b in range(size):
+            observed = [counts[(a * i + b) % size] for i in range(size)]
+            scores.append((_chi_squared_counts(observed, probabilities), (a, b)))
+    return [(key, affine(ciphertext, *key, decrypt=True, alphabet=alphabet), round(score, 5))
+            for score, key in sorted(scores)[:top]]
+
+
+# Nombre de lettres du texte chiffré utilisées pour estimer la longueur de la clé
+_KEY_LENGTH_SAMPLE = 20000
+
+
+def _reference_probabilities(language: str) -> tuple[str, list[float]]:
+    ''' Alphabet de la langue et probabilité (entre 0 et 1) de chacune de ses lettres '''
+    reference = get_frequencies(language)
+    alphabet = ''.join(letter for letter, _ in reference)
+    return alphabet, [percentage / 100 for _, percentage in reference]
+
+
+def _letters_only(text: str, alphabet: str) -> bytes:
+    ''' Indices des lettres de ``text`` (majuscules ou minuscules), sans les autres caractères '''
+    return _encode_indices(text.upper(), alphabet).translate(None, bytes([_NOT_A_LETTER]))
+
+
+def _column_counts(letters: bytes, key_length: int, size: int) -> list[list[int]]:
+    ''' Matrice des compteurs de lettres de chaque colonne (une colonne par lettre de clé) '''
+    matrix = []
+    for offset in range(key_length):
+        counter = Counter(letters[offset::key_length])
+        matrix.append([counter[i] for i in range(size)])
+    return matrix
+
+
+def _shift_scores(counts: list[int], probabilities: list[float]) -> list[float]:
+    '''
+    Corrélation entre les compteurs d'un texte chiffré par décalage et la
+    distribution de référence, pour chacun des décalages possibles.
+    '''
+    return [sum(map(mul, counts[shift:] + counts[:shift], probabilities))
+            for shift in range(len(counts))]
+
+
+def _shortest_period(key: str) -> str:
+    ''' Plus petite clé dont la répétition donne ``key`` ('ABAB' -> 'AB') '''
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and key[:period] * (len(key) // period) == key:
+            return key[:period]
+    return key
+
+
+def break_vigenere(ciphertext: str, max_key_length: int = 20, language: str = 'french', top: int = 3) -> list[tuple[str, str, float]]:
+    '''
+    Cherche automatiquement la clé d'un texte chiffré avec le chiffre de
+    Vigenère.
+
+    1. Pour chaque longueur de clé de 1 à ``max_key_length``, le texte est
+       découpé en colonnes et on calcule l'indice de coïncidence moyen des
+       colonnes : il est proche de celui de la langue pour la bonne
+       longueur.
+    2. Pour les meilleures longueurs, chaque colonne est un chiffre de
+       César : on choisit le décalage dont la distribution décalée
+       ressemble le plus à celle de la langue ``language``.
+
+    Les caractères qui ne sont pas des lettres sont ignorés. Retourne au
+    plus ``top`` candidats ``(clé, texte déchiffré, score)`` triés du plus
+    probable au moins probable. Le score est le khi carré du texte
+    déchiffré (voir ``chi_squared``) : plus il est petit, mieux c'est.
+
+    >>> plain = prepare("La cryptographie est l'art de protéger des messages en les rendant "
+    ...                 "incompréhensibles pour toute personne qui ne possède pas la clé. "
+    ...                 "Le chiffre de Vigenère a longtemps été considéré comme indéchiffrable, "
+    ...                 "jusqu'à ce que Babbage et Kasiski montrent comment retrouver la longueur "
+    ...                 "de la clé en étudiant les répétitions du texte chiffré.")
+    >>> key, text, score = break_vigenere(vigenere(plain, 'CLE'), max_key_length=6)[0]
+    >>> key
+    'CLE'
+    >>> text == plain
+    True
+    '''
+    alphabet, probabilities = _reference_probabilities(language)
+    size = len(alphabet)
+    letters = _letters_only(ciphertext, alphabet)
+    if not letters:
+        return []
+    max_key_length = max(1, min(max_key_length, len(letters)))
+
+    # Longueur de clé : indice de coïncidence moyen des colonnes d'un échantillon
+    sample = letters[:_KEY_LENGTH_SAMPLE]
+    ic_by_length = []
+    for key_length in range(1, max_key_length + 1):
+        total = 0.0
+        for counts in _column_counts(sample, key_length, size):
+            n = sum(counts)
+            if n > 1:
+                total += sum(c * (c - 1) for c in counts) / (n * (n - 1))
+        ic_by_length.append((total / key_length, key_length))
+    ic_by_length.sort(reverse=True)
+
+    # Clé : meilleur décalage de chaque colonne, sur tout le texte
+    candidates = {}
+    for _, key_length in ic_by_length[:2 * top]:
+        columns = _column_counts(letters, key_length, size)
+        shifts = []
+        plain_counts = [0] * size
+        for counts in columns:
+            scores = _shift_scores(counts, probabilities)
+            shift = scores.index(max(scores))
+            shifts.append(shift)
+            for i in range(size):
+                plain_counts[i] += counts[(i + shift) % size]
+        key = _shortest_period(''.join(alphabet[shift] for shift in shifts))
+        if key not in candidates:
+            profile = FrequencyProfile(plain_counts, len(letters), alphabet)
+            candidates[key] = profile.chi_squared(language)
+
+    ranking = sorted(candidates.items(), key=lambda item: item[1])[:top]
+    text = _decode_indices(letters, alphabet)
+    return [(key, vigenere(text, key, decrypt=True, alphabet=alphabet), score)
+            for key, score in ranking]
+
+
+@lru_cache(maxsize=4)
+def quadgram_table(reference: str, alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> array:
+    '''
+    Construit la table de vraisemblance des quadrigrammes d'un texte de
+    référence (déjà préparé avec ``prepare``).
+
+    La table est un tableau plat de ``len(alphabet) ** 4`` nombres à
+    virgule, indexé par le code du quadrigramme (voir ``ngram_code``) : la
+    case d'un quadrigramme contient le logarithme (base 10) de sa
+    probabilité dans la référence. Les quadrigrammes absents reçoivent une
+    valeur plancher très basse.
+
+    >>> table = quadgram_table(prepare("Le chat et le chien jouent dans le jardin"))
+    >>> table[ngram_code('CHAT')] > table[ngram_code('QZXW')]
+    True
+    '''
+    size = len(alphabet)
+    return _log_probabilities(_ngram_code_counts(_encode_indices(reference, alphabet), 4, size), size ** 4)
+
+
+@lru_cache(maxsize=4)
+def _language_quadgram_table(language: str) -> tuple[str, array]:
+    ''' Alphabet et table des quadrigrammes (voir ``quadgram_table``) précalculés de la langue '''
+    from csud.corpus import ngram_reference
+    alphabet, counts = ngram_reference(language, 4)
+    return alphabet, _log_probabilities(counts, len(alphabet) ** 4)
+
+
+def _log_probabilities(counts: dict[int, int], size: int) -> array:
+    ''' Tableau plat des logarithmes des probabilités des codes comptés dans ``counts`` '''
+    total = sum(counts.values())
+    if total == 0:
+        raise ValueError("reference text contains no quadgram")
+    table = array('d', [log10(0.01 / total)]) * size
+    for code, count in counts.items():
+        table[code] = log10(count / total)
+    return table
+
+
+def _hill_climb(quadgrams: list[tuple[int, int, int, int, int]], table: array, size: int,
+                start: list[int], rng: Random, shuffles: int) -> tuple[float, list[int]]:
+    '''
+    Améliore la clé de déchiffrement ``start`` (lettre chiffrée -> lettre
+    claire) en échangeant deux lettres tant que le score augmente.
+
+    ``quadgrams`` contient les quadrigrammes distincts du texte chiffré
+    sous la forme (a, b, c, d, nombre d'apparitions). Lors d'un échange,
+    seuls les quadrigrammes contenant l'une des deux lettres échangées sont
+    réévalués.
+    '''
+    plain = list(start)
+    for _ in range(shuffles):
+        i, j = rng.randrange(size), rng.randrange(size)
+        plain[i], plain[j] = plain[j], plain[i]
+
+    by_letter = [[] for _ in range(size)]
+    for quadgram in quadgrams:
+        for letter in set(quadgram[:4]):
+            by_letter[letter].append(quadgram)
+
+    def score(selection):
+        return sum(count * table[((plain[a] * size + plain[b]) * size + plain[c]) * size + plain[d]]
+                   for a, b, c, d, count in selection)
+
+    pairs = [(x, y) for x in range(size) for y in range(x + 1, size) if by_letter[x] or by_letter[y]]
+    improved = True
+    while improved:
+        improved = False
+        rng.shuffle(pairs)
+        for x, y in pairs:
+            affected = by_letter[x] + [q for q in by_letter[y] if x not in q[:4]]
+            before = score(affected)
+            plain[x], plain[y] = plain[y], plain[x]
+            if score(affected) > before + 1e-9:
+                improved = True
+            else:
+                plain[x], plain[y] = plain[y], plain[x]
+    return score(quadgrams), plain
+
+
+# Données partagées par les tâches d'un processus de calcul (voir ``_parallel_map``)
+_worker_state = {}
+
+
+def _init_worker(state: dict) -> None:
+    ''' Prépare un processus de calcul en y mémorisant les données communes aux tâches '''
+    _worker_state.clear()
+    _worker_state.update(state)
+
+
+def _parallel_map(function, tasks: list, workers: int | None = None, **state):
+    '''
+    Exécute ``function`` sur chaque tâche et produit les couples (numéro de
+    la tâche, résultat) au fur et à mesure qu'ils sont terminés.
+
+    Avec ``workers`` > 1, les tâches sont réparties dans un groupe de
+    processus. Les données ``state`` ne sont transmises qu'une fois à
+    chaque processus, qui les retrouve dans ``_worker_state``. Si les
+    processus ne sont pas disponibles (par exemple dans Pyodide), tout est
+    exécuté dans le processus courant.
+    '''
+    if workers is not None and workers > 1 and len(tasks) > 1:
+        try:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state,))
+            futures = {executor.submit(function, task): index for index, task in enumerate(tasks)}
+        except (ImportError, OSError, NotImplementedError, RuntimeError):
+            pass
+        else:
+            with executor:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            return
+
+    # Les données ne sont installées que pendant chaque appel, puis l'état
+    # précédent est remis : entre deux résultats, un autre appel de
+    # ``_parallel_map`` (par exemple dans la boucle qui consomme celui-ci)
+    # peut donc utiliser ``_worker_state`` sans rien effacer.
+    for index, task in enumerate(tasks):
+        previous = dict(_worker_state)
+        _init_worker(state)
+        try:
+            result = function(task)
+        finally:
+            _init_worker(previous)
+        yield index, result
+
+
+def _climb_task(task: tuple[list[int], int, int]) -> tuple[float, list[int]]:
+    ''' Une recherche de ``break_substitution``, exécutable dans un autre processus '''
+    start, seed, shuffles = task
+    state = _worker_state
+    return _hill_climb(state['quadgrams'], state['table'], state['size'], start, Random(seed), shuffles)
+
+
+def break_substitution(ciphertext: str, reference: str | None = None, language: str = 'french',
+                       restarts: int = 10, workers: int | None = None, seed: int | None = None,
+                       alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', top: int = 3) -> list[tuple[str, str, float]]:
+    '''
+    Cherche automatiquement la clé d'un texte chiffré par substitution
+    monoalphabétique.
+
+    La recherche part de la clé obtenue en associant les lettres du texte
+    chiffré aux lettres de la référence par ordre de fréquence, puis
+    l'améliore en échangeant deux lettres tant que le texte déchiffré
+    ressemble davantage à la référence, selon ses quadrigrammes (voir
+    ``quadgram_table``). La référence est le texte ``reference`` (déjà
+    préparé avec ``prepare``) ou, par défaut, les statistiques précalculées
+    de la langue ``language`` (voir ``csud.corpus``).
+
+    La recherche est recommencée ``restarts`` fois à partir de clés
+    perturbées au hasard (``seed`` permet de reproduire les résultats).
+    Avec ``workers`` > 1, les recherches sont réparties sur plusieurs
+    processus.
+
+    Retourne au plus ``top`` candidats ``(clé, texte déchiffré, score)``
+    du plus probable au moins probable. La clé s'utilise avec
+    ``substitution``. Le score est la somme des logarithmes des
+    probabilités des quadrigrammes : plus il est grand, mieux c'est.
+    '''
+    size = len(alphabet)
+    letters = _letters_only(ciphertext, alphabet)
+    if len(letters) < 4:
+        raise ValueError("ciphertext is too short (less than 4 letters)")
+    if reference is not None:
+        table = quadgram_table(reference, alphabet)
+        reference_counts = frequency_profile(reference, alphabet).counts
+    else:
+        reference_alphabet, table = _language_quadgram_table(language)
+        if reference_alphabet != alphabet:
+            raise ValueError(f"alphabet does not match the '{language}' statistics alphabet {reference_alphabet!r}")
+        reference_counts = reference_ngram_counts(language, 1, dense=True)
+    quadgrams = []
+    for code, count in _ngram_code_counts(letters, 4, size).items():
+        code, d = divmod(code, size)
+        code, c = divmod(code, size)
+        a, b = divmod(code, size)
+        quadgrams.append((a, b, c, d, count))
+
+    # Clé de départ : les lettres par ordre de fréquence décroissante
+    cipher_counts = Counter(letters)
+    by_frequency = sorted(range(size), key=lambda letter: -cipher_counts[letter])
+    plain_by_frequency = sorted(range(size), key=lambda letter: -reference_counts[letter])
+    start = [0] * size
+    for cipher_letter, plain_letter in zip(by_frequency, plain_by_frequency):
+        start[cipher_letter] = plain_letter
+
+    rng = Random(seed)
+    tasks = [(start, rng.randrange(2 ** 32), 0 if i == 0 else 2 * size) for i in range(restarts)]
+    # Les clés qui ne diffèrent que par des lettres absentes du texte
+    # chiffré donnent le même texte déchiffré : on n'en garde qu'une.
+    present = sorted(cipher_counts)
+    results = {}
+    for _, (score, plain) in _parallel_map(_climb_task, tasks, workers,
+                                            quadgrams=quadgrams, table=table, size=size):
+        key = [''] * size
+        for cipher_letter, plain_letter in enumerate(plain):
+            key[plain_letter] = alphabet[cipher_letter]
+        results.setdefault(tuple(plain[letter] for letter in present), (score, ''.join(key)))
+
+    ranking = sorted(results.values(), reverse=True)[:top]
+    return [(key, substitution(ciphertext, key, decrypt=True, alphabet=alphabet), round(score, 5))
+            for score, key in ranking]
+
+
+# Mesures disponibles pour ``analyze_many``
+ANALYSIS_METRICS = {
+    'length': lambda profile, language: profile.length,
+    'letters': lambda profile, language: profile.letters,
+    'ic': lambda profile, language: profile.index_of_coincidence(),
+    'friedman': lambda profile, language: profile.friedman_characteristic(),
+    'chi2': lambda profile, language: profile.chi_squared(language),
+}
+
+
+def _profile_task(chunk: str) -> tuple[list[int], int]:
+    ''' Compte les lettres d'un morceau de texte, exécutable dans un autre processus '''
+    profile = FrequencyProfile.from_text(chunk, _worker_state['alphabet'])
+    return list(profile.counts), profile.length
+
+
+def iter_analyze_many(texts: Mapping[str, str], metrics: Iterable[str] = ('ic', 'friedman'),
+                      workers: int | None = None, chunk_size: int = 1 << 20, language: str = 'french',
+                      alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> Iterator[tuple[str, dict[str, float]]]:
+    '''
+    Comme ``analyze_many``, mais produit les couples (nom, mesures) au fur
+    et à mesure que les textes sont analysés, dans l'ordre où ils se
+    terminent.
+    '''
+    metrics = list(metrics)
+    for metric in metrics:
+        if metric not in ANALYSIS_METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Known metrics: {list(ANALYSIS_METRICS)}")
+
+    # Les grands textes sont découpés en morceaux comptés séparément
+    names = list(texts)
+    tasks = []
+    owners = []
+    for number, name in enumerate(names):
+        text = texts[name]
+        for start in range(0, max(len(text), 1), chunk_size):
+            tasks.append(text[start:start + chunk_size])
+            owners.append(number)
+    remaining = Counter(owners)
+    profiles = [FrequencyProfile([0] * len(alphabet), 0, alphabet) for _ in names]
+
+    for index, (counts, length) in _parallel_map(_profile_task, tasks, workers, alphabet=alphabet):
+        number = owners[index]
+        profiles[number] += FrequencyProfile(counts, length, alphabet)
+        remaining[number] -= 1
+        if remaining[number] == 0:
+            profile = profiles[number]
+            yield names[number], {metric: ANALYSIS_METRICS[metric](profile, language) for metric in metrics}
+
+
+def analyze_many(texts: Mapping[str, str], metrics: Iterable[str] = ('ic', 'friedman'),
+                 workers: int | None = None, chunk_size: int = 1 << 20, language: str = 'french',
+                 alphabet: str = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ') -> dict[str, dict[str, float]]:
+    '''
+    Calcule les mesures ``metrics`` (voir ``ANALYSIS_METRICS`` : 'length',
+    'letters', 'ic', 'friedman', 'chi2') de chacun des textes ``texts``
+    ({nom: texte}).
+
+    Avec ``workers`` > 1, le travail est réparti sur plusieurs processus ;
+    les textes plus longs que ``chunk_size`` caractères sont découpés en
+    morceaux dont les comptes sont ensuite additionnés. Si les processus ne
+    sont pas disponibles (Pyodide), tout est calculé dans le processus
+    courant.
+
+    Retourne un tableau {nom: {mesure: valeur}}, dans l'ordre des textes.
+    Le khi carré ('chi2') est calculé par rapport à la langue
+    ``language``.
+
+    >>> analyze_many({'a': "HELLO", 'b': "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}, chunk_size=2)
+    {'a': {'ic': 0.1, 'friedman': 0.24154}, 'b': {'ic': 0.0, 'friedman': 0.0}}
+    >>> for name, metrics in iter_analyze_many({'a': "HELLO", 'b': "WORLD"}, ['ic'], chunk_size=2):
+    ...     print(name, metrics['ic'], analyze_many({'inner': "ABCA"}, ['ic'])['inner']['ic'])
+    a 0.1 0.16667
+    b 0.0 0.16667
+    '''
+    results = dict(iter_analyze_many(texts, metrics, workers, chunk_size, language, alphabet))
+    return {name: results[name] for name in texts}
+
+
+# Profilage : statistiques par fonction [appels, secondes, caractères],
+# fonctions d'origine, emplacements remplacés et état des caches au départ
+_profile_stats = {}
+_profiled_functions = {}
+_profile_patches = []
+_profile_cache_start = {}
+
+# Fonctions du profilage, qui ne sont pas elles-mêmes profilées
+_PROFILING_API = ('enable_profiling', 'disable_profiling', 'profiling', 'reset_profiling', 'profiling_report')
+
+
+# Paramètres contenant le texte traité, pour compter les caractères
+_TEXT_PARAMETERS = ('text', 'message', 'ciphertext', 'reference')
+
+
+def _instrument(name: str, function):
+    ''' Retourne une version de ``function`` qui enregistre ses appels dans ``_profile_stats`` '''
+    from inspect import signature
+    stats = _profile_stats.setdefault(name, [0, 0.0, 0])
+    # Position et nom du paramètre contenant le texte (-1 : aucun, les
+    # caractères ne sont pas comptés)
+    parameters = list(signature(function).parameters)
+    position = next((i for i, parameter in enumerate(parameters) if parameter in _TEXT_PARAMETERS), -1)
+    parameter = parameters[position] if position >= 0 else None
+
+    @wraps(function)
+    def profiled(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            stats[0] += 1
+            stats[1] += perf_counter() - start
+            if parameter is not None:
+                text = args[position] if position < len(args) else kwargs.get(parameter)
+                if isinstance(text, (str, EncodedText)):
+                    stats[2] += len(text)
+
+    # ``wraps`` ne copie pas les méthodes de ``lru_cache`` : sans elles,
+    # ``frequency_profile.cache_clear()`` échouerait pendant le profilage
+    for attribute in ('cache_info', 'cache_clear', 'cache_parameters'):
+        if hasattr(function, attribute):
+            setattr(profiled, attribute, getattr(function, attribute))
+    return profiled
+
+
+def _caches() -> dict:
+    ''' Fonctions du module dont les résultats sont gardés en cache '''
+    module = vars(sys.modules[__name__])
+    return {name: _profiled_functions.get(name, value) for name, value in module.items()
+            if hasattr(_profiled_functions.get(name, value), 'cache_info')}
+
+
+def enable_profiling() -> None:
+    '''
+    Active le profilage des fonctions publiques de ce module : nombre
+    d'appels, temps cumulé (appels imbriqués compris), nombre de
+    caractères traités (ceux du paramètre ``text``, ``message``,
+    ``ciphertext`` ou ``reference`` ; '-' pour les fonctions qui n'en ont
+    pas) et taux de réussite des caches. Voir ``profiling_report``.
+
+    Les fonctions sont remplacées par des versions instrumentées, ici et
+    dans les modules qui les ont importées (``from csud.crypto import *``).
+    ``disable_profiling`` remet les fonctions d'origine : lorsque le
+    profilage est désactivé, il ne coûte rien.
+    '''
+    if _profiled_functions:
+        return
+    module = sys.modules[__name__]
+    for name, value in list(vars(module).items()):
+        code = getattr(getattr(value, '__wrapped__', value), '__code__', None)
+        if (name.startswith('_') or name in _PROFILING_API or code is None
+                or getattr(value, '__module__', None) != __name__
+                or code.co_flags & 0x20):  # les générateurs ne sont pas profilés
+            continue
+        _profiled_functions[name] = value
+    for name, info in ((name, cached.cache_info()) for name, cached in _caches().items()):
+        _profile_cache_start.setdefault(name, (info.hits, info.misses))
+
+    wrappers = {name: _instrument(name, function) for name, function in _profiled_functions.items()}
+    for other in list(sys.modules.values()):
+        namespace = getattr(other, '__dict__', None)
+        if namespace is None:
+            continue
+        for name, function in _profiled_functions.items():
+            if namespace.get(name) is function:
+                namespace[name] = wrappers[name]
+                _profile_patches.append((namespace, name, function))
+
+
+def disable_profiling() -> None:
+    ''' Désactive le profilage et remet les fonctions d'origine (les mesures sont conservées) '''
+    for namespace, name, function in _profile_patches:
+        if namespace.get(name) is not function:
+            namespace[name] = function
+    _profile_patches.clear()
+    _profiled_functions.clear()
+
+
+def reset_profiling() -> None:
+    ''' Efface les mesures du profilage '''
+    for stats in _profile_stats.values():
+        stats[:] = [0, 0.0, 0]
+    _profile_cache_start.clear()
+    for name, cached in _caches().items():
+        info = cached.cache_info()
+        _profile_cache_start[name] = (info.hits, info.misses)
+
+
+class _Profiling:
+    ''' Contexte retourné par ``profiling`` '''
+
+    def __enter__(self):
+        enable_profiling()
+        return self
+
+    def __exit__(self, *exc_info):
+        disable_profiling()
+
+    def report(self, format: str = 'table') -> str:
+        return profiling_report(format)
+
+
+def profiling() -> _Profiling:
+    '''
+    Active le profilage le temps d'un bloc ``with`` :
+
+        with profiling() as p:
+            index_of_coincidence(text)
+        print(p.report())
+    '''
+    return _Profiling()
+
+
+def profiling_report(format: str = 'table') -> str:
+    '''
+    Retourne les mesures du profilage, sous forme de tableau
+    (``format='table'``) ou de JSON (``format='json'``).
+
+        with profiling():
+            friedman_characteristic(miserables_tome_1)
+        print(profiling_report())
+
+    affiche par exemple :
+
+        function                    calls   total (ms)    chars/s
+        friedman_characteristic         1       20.310   3.26e+07
+        frequency_profile               1       20.302   3.26e+07
+
+        cache                        hits   misses   hit rate
+        frequency_profile               0        1       0.0%
+
+    >>> profiling_report(format='xml')
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown format 'xml'. Known formats: ['table', 'json']
+    '''
+    functions = {name: {'calls': calls, 'seconds': seconds, 'chars': chars,
+                        'chars_per_second': chars / seconds if seconds > 0 else 0.0}
+                 for name, (calls, seconds, chars) in _profile_stats.items() if calls}
+    caches = {}
+    for name, cached in sorted(_caches().items()):
+        info = cached.cache_info()
+        start_hits, start_misses = _profile_cache_start.get(name, (0, 0))
+        hits, misses = info.hits - start_hits, info.misses - start_misses
+        if hits or misses:
+            caches[name] = {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses)}
+
+    if format == 'json':
+        import json
+        return json.dumps({'functions': functions, 'caches': caches}, indent=2)
+    if format != 'table':
+        raise ValueError(f"Unknown format '{format}'. Known formats: ['table', 'json']")
+
+    lines = [f"{'function':24} {'calls':>8} {'total (ms)':>12} {'chars/s':>10}"]
+    for name, stats in sorted(functions.items(), key=lambda item: -item[1]['seconds']):
+        rate = f"{stats['chars_per_second']:.3g}" if stats['chars'] else '-'
+        lines.append(f"{name:24} {stats['calls']:>8} {stats['seconds'] * 1000:>12.3f} {rate:>10}")
+    if caches:
+        lines += ['', f"{'cache':24} {'hits':>8} {'misses':>8} {'hit rate':>10}"]
+        for name, stats in caches.items():
+            lines.append(f"{name:24} {stats['hits']:>8} {stats['misses']:>8} {stats['hit_rate']:>10.1%}")
+    return '\n'.join(lines)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,253 @@
+'''
+Mesure la vitesse des fonctions publiques de ``csud.crypto`` sur les
+textes de référence de ``csud.corpus``, d'une phrase jusqu'aux textes
+complets (``miserables_tome_1``, ``faust_1``).
+
+Pour chaque fonction et chaque taille de texte, le script indique le débit
+(caractères par seconde) et le pic de mémoire, puis l'exposant de
+croissance : environ 1 pour un temps proportionnel à la longueur du texte,
+2 pour un temps quadratique.
+
+    python benchmark_crypto.py                      # affiche les mesures
+    python benchmark_crypto.py --save-baseline      # enregistre la référence
+    python benchmark_crypto.py --check              # échoue en cas de régression
+    python benchmark_crypto.py --output cpython.json
+    python benchmark_crypto.py --compare cpython.json pyodide.json
+
+Avec ``--check``, le script se termine avec le code 1 si le débit d'une
+mesure tombe sous la référence (à la tolérance près) ou si l'exposant de
+croissance d'une fonction augmente nettement. L'exposant ne dépend pas de
+la machine, contrairement au débit : sur une autre machine, enregistrer
+d'abord une nouvelle référence.
+
+Le temps d'importation de ``csud.crypto`` (dans un nouvel interpréteur,
+sans cache de modules déjà chargés) est aussi mesuré et vérifié.
+
+Le script fonctionne hors ligne avec CPython comme avec Pyodide (on peut
+alors comparer les deux fichiers de résultats avec ``--compare``).
+'''
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from csud import crypto
+from csud.corpus import load_corpus
+
+BASELINE = Path(__file__).resolve().parent / 'benchmark_baseline.json'
+
+SENTENCE = "Il m'a toujours impressionné, ce vieux château près de la forêt."
+KEY = 'QOLWNXTMGDKBPRSEUVFZHJIYCA'
+
+# Tailles mesurées : une phrase, des extraits (en caractères) et le texte complet
+SIZES = ['sentence', 1_000, 10_000, 100_000, 'full']
+CORPORA = ['miserables_tome_1', 'faust_1']
+
+
+def raw_text(size: int) -> str:
+    '''
+    Texte « brut » de ``size`` caractères pour ``prepare`` : la phrase de
+    référence répétée, avec ses accents, majuscules et ponctuation, pour
+    mesurer aussi le repli des caractères non ASCII.
+    '''
+    sentence = SENTENCE + ' '
+    return (sentence * (size // len(sentence) + 1))[:size]
+
+
+# Fonction mesurée -> appel sur un texte préparé
+CASES = {
+    'substitution': lambda text: crypto.substitution(text, KEY),
+    'caesar': lambda text: crypto.caesar(text, 3),
+    'vigenere': lambda text: crypto.vigenere(text, 'LEMON'),
+    'prepare': lambda text: crypto.prepare(text),
+    'letter_frequencies': lambda text: crypto.letter_frequencies(text),
+    'digram_frequencies': lambda text: crypto.digram_frequencies(text, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'),
+    'index_of_coincidence': lambda text: crypto.index_of_coincidence(text),
+    'friedman_characteristic': lambda text: crypto.friedman_characteristic(text),
+    'extract_subtexts': lambda text: crypto.extract_subtexts(text, 7),
+}
+
+
+def clear_caches() -> None:
+    ''' Vide les caches de résultats pour mesurer le vrai coût de chaque appel '''
+    for name in ('frequency_profile',):
+        function = getattr(crypto, name, None)
+        if hasattr(function, 'cache_clear'):
+            function.cache_clear()
+
+
+def measure(function, text: str, repeat: int) -> tuple[float, int]:
+    ''' Meilleur temps (en secondes) sur ``repeat`` appels, et pic de mémoire (en octets) '''
+    best = math.inf
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        function(text)
+        best = min(best, time.perf_counter() - start)
+    clear_caches()
+    tracemalloc.start()
+    function(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def scaling_exponent(points: list[tuple[int, float]]) -> float:
+    ''' Pente de la droite des moindres carrés de log(temps) en fonction de log(taille) '''
+    points = [(math.log(size), math.log(seconds)) for size, seconds in points if seconds > 0]
+    if len(points) < 2:
+        return float('nan')
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+IMPORT_SCRIPT = "import time; start = time.perf_counter(); import csud.crypto; print(time.perf_counter() - start)"
+
+
+def import_time(repeat: int) -> float | None:
+    '''
+    Meilleur temps (en secondes) d'importation de ``csud.crypto`` dans un
+    nouvel interpréteur, ou None si on ne peut pas lancer de processus
+    (Pyodide).
+    '''
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    best = math.inf
+    try:
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], env=env, check=True,
+                                    capture_output=True, text=True).stdout
+            best = min(best, float(output))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return best
+
+
+def run(functions: list[str], corpora: list[str], repeat: int) -> dict:
+    results = {
+        'python': platform.python_implementation() + ' ' + platform.python_version(),
+        'platform': sys.platform,
+        'import_seconds': import_time(max(repeat, 5)),
+        'functions': {},
+    }
+    if results['import_seconds'] is not None:
+        print(f"{'import csud.crypto':45} {results['import_seconds'] * 1000:9.1f} ms", flush=True)
+    for corpus in corpora:
+        full = load_corpus(corpus)
+        for name in functions:
+            function = CASES[name]
+            rows = []
+            for size in SIZES:
+                if size == 'sentence':
+                    text = crypto.prepare(SENTENCE)
+                else:
+                    text = full if size == 'full' else full[:size]
+                if name == 'prepare':
+                    text = SENTENCE if size == 'sentence' else raw_text(len(text))
+                seconds, peak = measure(function, text, repeat)
+                rows.append({
+                    'size': len(text),
+                    'label': corpus if size == 'full' else str(size),
+                    'seconds': seconds,
+                    'chars_per_second': len(text) / seconds if seconds > 0 else float('inf'),
+                    'peak_memory': peak,
+                })
+            key = f'{name}[{corpus}]'
+            results['functions'][key] = {
+                'rows': rows,
+                # Les tout petits textes mesurent surtout le coût fixe d'un appel
+                'exponent': scaling_exponent([(row['size'], row['seconds']) for row in rows if row['size'] >= 1000]),
+            }
+            print(f"{key:45} {format_rate(rows[-1]['chars_per_second']):>12} "
+                  f"{format_bytes(rows[-1]['peak_memory']):>10}  n^{results['functions'][key]['exponent']:.2f}",
+                  flush=True)
+    return results
+
+
+def format_rate(rate: float) -> str:
+    return f'{rate / 1e6:.2f} Mc/s'
+
+
+def format_bytes(size: float) -> str:
+    return f'{size / 1e6:.1f} MB'
+
+
+def check(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    ''' Liste des régressions de ``results`` par rapport à ``baseline`` '''
+    problems = []
+    current_import, baseline_import = results.get('import_seconds'), baseline.get('import_seconds')
+    # Marge absolue de 20 ms : le démarrage d'un processus varie beaucoup
+    if current_import and baseline_import and current_import > baseline_import * (1 + tolerance) + 0.02:
+        problems.append(f"import csud.crypto: {current_import * 1000:.1f} ms "
+                        f"> baseline {baseline_import * 1000:.1f} ms")
+    for key, reference in baseline['functions'].items():
+        if key not in results['functions']:
+            continue
+        current = results['functions'][key]
+        for row, base_row in zip(current['rows'], reference['rows']):
+            # Sur les petits textes, la mesure est trop bruitée pour être comparée
+            if row['size'] < 10_000:
+                continue
+            if row['chars_per_second'] < base_row['chars_per_second'] * (1 - tolerance):
+                problems.append(f"{key} on {row['label']}: {format_rate(row['chars_per_second'])} "
+                                f"< baseline {format_rate(base_row['chars_per_second'])}")
+        if current['exponent'] > reference['exponent'] + 0.3:
+            problems.append(f"{key}: scaling n^{current['exponent']:.2f} > baseline n^{reference['exponent']:.2f}")
+    return problems
+
+
+def compare(first: dict, second: dict) -> None:
+    ''' Affiche un tableau comparant deux fichiers de résultats (par exemple CPython et Pyodide) '''
+    print(f"| function | {first['python']} ({first['platform']}) | {second['python']} ({second['platform']}) | ratio |")
+    print('|---|---:|---:|---:|')
+    if first.get('import_seconds') and second.get('import_seconds'):
+        a, b = first['import_seconds'], second['import_seconds']
+        print(f'| import csud.crypto | {a * 1000:.1f} ms | {b * 1000:.1f} ms | {b / a:.1f}x |')
+    for key, reference in first['functions'].items():
+        if key not in second['functions']:
+            continue
+        a = reference['rows'][-1]['chars_per_second']
+        b = second['functions'][key]['rows'][-1]['chars_per_second']
+        print(f'| {key} | {format_rate(a)} | {format_rate(b)} | {a / b:.1f}x |')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesure la vitesse des fonctions de csud.crypto")
+    parser.add_argument('--functions', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--corpora', nargs='+', choices=CORPORA, default=CORPORA)
+    parser.add_argument('--repeat', type=int, default=3, help="nombre de mesures par cas (le meilleur temps est gardé)")
+    parser.add_argument('--output', help="enregistre les résultats dans ce fichier JSON")
+    parser.add_argument('--save-baseline', action='store_true', help=f"enregistre les résultats comme référence ({BASELINE.name})")
+    parser.add_argument('--check', action='store_true', help="échoue si les résultats sont moins bons que la référence")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="baisse de débit tolérée par rapport à la référence")
+    parser.add_argument('--compare', nargs=2, metavar=('A.json', 'B.json'), help="compare deux fichiers de résultats")
+    args = parser.parse_args()
+
+    if args.compare:
+        first, second = (json.loads(Path(name).read_text()) for name in args.compare)
+        compare(first, second)
+        return
+
+    results = run(args.functions, args.corpora, args.repeat)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=1))
+    if args.save_baseline:
+        BASELINE.write_text(json.dumps(results, indent=1))
+    if args.check:
+        problems = check(results, json.loads(BASELINE.read_text()), args.tolerance)
+        for problem in problems:
+            print('REGRESSION:', problem, file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print('no regression')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+'''
+Construit les fichiers de données de ``csud.corpus`` (dossier
+``src/csud/data``) à partir des modules ``prepared_fr_texts.py`` et
+``prepared_de_texts.py``.
+
+Pour chaque texte, écrit ``<nom>.txt.z`` (texte compressé) et, pour
+chaque langue, ``<langue>.ngrams.z`` (comptes de lettres, de bigrammes et
+de quadrigrammes de tous les textes de la langue).
+
+    python build_corpus_data.py
+'''
+import importlib
+import zlib
+from collections import Counter
+from pathlib import Path
+
+from csud.corpus import CORPORA, NGRAM_SIZES, encode_statistics
+from csud.crypto import _encode_indices, _ngram_code_counts
+
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+SOURCES = {'french': 'prepared_fr_texts', 'german': 'prepared_de_texts'}
+DATA = Path(__file__).resolve().parent.parent / 'src' / 'csud' / 'data'
+
+
+def main():
+    for language, module_name in SOURCES.items():
+        module = importlib.import_module(module_name)
+        counts = {n: Counter() for n in NGRAM_SIZES}
+        for name, lang in CORPORA.items():
+            if lang != language:
+                continue
+            text = getattr(module, name)
+            (DATA / f'{name}.txt.z').write_bytes(zlib.compress(text.encode('ascii'), 9))
+            codes = _encode_indices(text, ALPHABET)
+            for n in NGRAM_SIZES:
+                counts[n].update(_ngram_code_counts(codes, n, len(ALPHABET)))
+            print(f"{name}: {len(text)} lettres")
+        (DATA / f'{language}.ngrams.z').write_bytes(encode_statistics(ALPHABET, counts))
+
+
+if __name__ == '__main__':
+    main()
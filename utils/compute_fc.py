@@ -1,10 +1,11 @@
 import micropip
-await micropip.install("https://raw.githubusercontent.com/informatiquecsud/csud_modules/refs/heads/main/dist/csud-0.1.0-py3-none-any.whl")
+await micropip.install("https://raw.githubusercontent.com/informatiquecsud/csud_modules/refs/heads/main/dist/csud-0.2.0-py3-none-any.whl")
 
 from csud.crypto import *
-
-from prepared_fr_texts import *
-from prepared_de_texts import *
+from csud.corpus import (
+    miserables_tome_1, miserables_tome_3, miserables_tome_5, trois_mousquetaires,
+    faust_1, also_sprach_zarathustra,
+)
 
 print("Français")
 print("--------")
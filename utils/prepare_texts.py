@@ -0,0 +1,42 @@
+'''
+Régénère un module de textes préparés (comme ``prepared_fr_texts.py``) à
+partir de fichiers de texte bruts.
+
+Exemple :
+
+    python prepare_texts.py --language german_legacy prepared_de_texts.py \
+        faust_1=faust.txt also_sprach_zarathustra=zarathustra.txt
+
+Pour ``csud.corpus``, utiliser la table de repli ``csud.corpus.FOLDINGS[langue]``
+('german_legacy' pour les textes allemands).
+
+Chaque texte est lu et préparé morceau par morceau (voir ``iter_text`` et
+``iter_prepare``) : la mémoire utilisée ne dépend pas de la taille des
+fichiers.
+'''
+import argparse
+
+from csud.crypto import iter_prepare, iter_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prépare des textes bruts et les écrit dans un module Python")
+    parser.add_argument('output', help="fichier .py à écrire")
+    parser.add_argument('texts', nargs='+', metavar='NOM=FICHIER', help="nom de la variable et fichier brut")
+    parser.add_argument('--language', default='french', help="table de repli des accents (french, german, ...)")
+    parser.add_argument('--decompose', action='store_true', help="réduire les autres lettres accentuées à leur lettre de base")
+    args = parser.parse_args()
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        for spec in args.texts:
+            name, _, filename = spec.partition('=')
+            if not name.isidentifier() or not filename:
+                parser.error(f"invalid text '{spec}', expected NOM=FICHIER")
+            output.write(f"{name} = '")
+            for prepared in iter_prepare(iter_text(filename), args.language, args.decompose):
+                output.write(prepared)
+            output.write("'\n")
+
+
+if __name__ == '__main__':
+    main()